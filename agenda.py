@@ -0,0 +1,187 @@
+from datetime import date, datetime, timedelta
+
+from flask import current_app
+from sqlalchemy import delete, event, inspect
+from sqlalchemy.exc import IntegrityError
+
+from db import db
+from models import AgendaWeekModel, AssignmentModel, ExamModel, TimetableModel
+
+DAYS = ("monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday")
+
+
+def week_start(value):
+    """Monday of the week containing ``value`` (a date or datetime)"""
+    if isinstance(value, datetime):
+        value = value.date()
+    return value - timedelta(days=value.weekday())
+
+
+def parse_week(value):
+    """Monday of an ISO week ("2026-W43") or of the week containing a date"""
+    try:
+        if "W" in value.upper():
+            return datetime.strptime(value.upper() + "-1", "%G-W%V-%u").date()
+        return week_start(date.fromisoformat(value))
+    except ValueError:
+        raise ValueError(f"Not a valid week: {value!r} (use 2026-W43 or a date).") from None
+
+
+def get_week(user_id, start):
+    """Slots of the week starting on ``start``, and the timetable entries that
+    couldn't be placed in it; built and stored on first read"""
+    record = AgendaWeekModel.query.filter_by(user_id=user_id, week_start=start).first()
+    max_age = timedelta(seconds=current_app.config["AGENDA_MAX_AGE"])
+    if record is not None and record.built_at > datetime.utcnow() - max_age:
+        return _load(record.slots), record.unplaced
+
+    slots, unplaced = build_week(user_id, start)
+    if record is None:
+        record = AgendaWeekModel(user_id=user_id, week_start=start)
+        db.session.add(record)
+    record.slots = slots
+    record.unplaced = unplaced
+    record.built_at = datetime.utcnow()
+    try:
+        db.session.commit()
+    except IntegrityError:
+        # Another request materialized the same week first
+        db.session.rollback()
+    return _load(slots), unplaced
+
+
+def build_week(user_id, start):
+    """Expand the weekly timetable and merge in the week's deadlines and exams.
+    Each source is read with one of its (user_id, ...) indexes. Returns the
+    slots and the timetable entries whose free-form day or times can't be
+    placed on the calendar."""
+    end = start + timedelta(days=7)
+    slots, unplaced = [], []
+
+    for entry in TimetableModel.query.filter(TimetableModel.user_id == user_id):
+        try:
+            day = start + timedelta(days=_day_index(entry.day))
+            begins = datetime.combine(day, _parse_time(entry.start_time))
+            ends = datetime.combine(day, _parse_time(entry.end_time))
+        except ValueError:
+            unplaced.append({
+                "id": entry.id,
+                "subject": entry.subject,
+                "day": entry.day,
+                "start_time": entry.start_time,
+                "end_time": entry.end_time,
+            })
+            continue
+        slots.append(_slot("class", entry.id, begins, ends, entry.subject, entry.subject, entry.room))
+
+    assignments = AssignmentModel.query.filter(
+        AssignmentModel.user_id == user_id,
+        AssignmentModel.due_date >= start,
+        AssignmentModel.due_date < end,
+    )
+    for assignment in assignments:
+        slots.append(_slot("assignment", assignment.id, assignment.due_date, None,
+                           assignment.subject, assignment.title, None, status=assignment.status))
+
+    exams = ExamModel.query.filter(
+        ExamModel.user_id == user_id,
+        ExamModel.exam_date >= start,
+        ExamModel.exam_date < end,
+    )
+    for exam in exams:
+        slots.append(_slot("exam", exam.id, exam.exam_date, None,
+                           exam.subject, exam.exam_type, exam.room))
+
+    slots.sort(key=lambda slot: (slot["start"], slot["kind"], slot["id"]))
+    return slots, unplaced
+
+
+def _day_index(name):
+    """0 for Monday; accepts full names and abbreviations like Wed"""
+    name = name.strip().lower()
+    for index, day in enumerate(DAYS):
+        if len(name) >= 3 and day.startswith(name):
+            return index
+    raise ValueError(name)
+
+
+def _parse_time(value):
+    """Time of day such as 9:00, 09:00:00, 9am or 2:30 PM"""
+    text = value.replace(" ", "").replace(".", "").upper()
+    for fmt in ("%H:%M", "%H:%M:%S", "%I:%M%p", "%I%p"):
+        try:
+            return datetime.strptime(text, fmt).time()
+        except ValueError:
+            pass
+    raise ValueError(value)
+
+
+def _slot(kind, item_id, start, end, subject, title, room, status=None):
+    return {
+        "kind": kind,
+        "id": item_id,
+        "start": start.isoformat(),
+        "end": end.isoformat() if end else None,
+        "subject": subject,
+        "title": title,
+        "room": room,
+        "status": status,
+    }
+
+
+def _load(slots):
+    return [
+        dict(
+            slot,
+            start=datetime.fromisoformat(slot["start"]),
+            end=datetime.fromisoformat(slot["end"]) if slot["end"] else None,
+        )
+        for slot in slots
+    ]
+
+
+# Incremental refresh: a change drops only the materialized weeks it affects,
+# in the same transaction, and the next read rebuilds them. Timetable entries
+# recur every week, so they drop all of the user's weeks.
+
+def drop_weeks(user_id, dates=None):
+    """Drop the weeks containing ``dates`` (all of the user's weeks if None)
+    after writes that bypass the ORM, such as bulk imports"""
+    starts = None if dates is None else {week_start(value) for value in dates}
+    _drop_weeks(db.session, user_id, starts)
+
+
+def _drop_weeks(connection, user_id, starts=None):
+    statement = delete(AgendaWeekModel.__table__).where(AgendaWeekModel.user_id == user_id)
+    if starts is not None:
+        if not starts:
+            return
+        statement = statement.where(AgendaWeekModel.week_start.in_(starts))
+    connection.execute(statement)
+
+
+def _changed_weeks(target, column):
+    history = inspect(target).attrs[column].history
+    values = list(history.added) + list(history.unchanged) + list(history.deleted)
+    return {week_start(value) for value in values if value is not None}
+
+
+@event.listens_for(AssignmentModel, "after_insert")
+@event.listens_for(AssignmentModel, "after_update")
+@event.listens_for(AssignmentModel, "after_delete")
+def _refresh_assignment_weeks(mapper, connection, target):
+    _drop_weeks(connection, target.user_id, _changed_weeks(target, "due_date"))
+
+
+@event.listens_for(ExamModel, "after_insert")
+@event.listens_for(ExamModel, "after_update")
+@event.listens_for(ExamModel, "after_delete")
+def _refresh_exam_weeks(mapper, connection, target):
+    _drop_weeks(connection, target.user_id, _changed_weeks(target, "exam_date"))
+
+
+@event.listens_for(TimetableModel, "after_insert")
+@event.listens_for(TimetableModel, "after_update")
+@event.listens_for(TimetableModel, "after_delete")
+def _refresh_timetable_weeks(mapper, connection, target):
+    _drop_weeks(connection, target.user_id)
@@ -1,16 +1,21 @@
+import os
+
 from flask import Flask
 from flask_smorest import Api
 from flask_jwt_extended import JWTManager
 from flask_cors import CORS
-from flask_migrate import Migrate
 
 from db import db
 from config import Config
-from resources.user_routes import blp as UserBlueprint
-from resources.timetable_routes import blp as TimetableBlueprint
-from resources.assignment_routes import blp as AssignmentBlueprint
-from resources.exam_routes import blp as ExamBlueprint
-from resources.note_router import blp as NoteBlueprint
+from cache import user_cache
+from events import broker
+from sharding import shards
+from startup import check_migration_version
+from jobs import init_jobs
+from purger import init_purger
+from archiver import init_archiver
+from utils.compression import init_compression
+from utils.profiling import init_profiling
 
 
 def create_app():
@@ -18,13 +23,23 @@ def create_app():
     
     # Load configuration
     app.config.from_object(Config)
+    production = app.config["STARTUP_MODE"] == "production"
+    cli = os.environ.get("FLASK_RUN_FROM_CLI") == "true"
     
     # Initialize extensions
+    shards.init_app(app)  # adds the shard binds, so before db.init_app
     db.init_app(app)
-    migrate = Migrate(app, db)
+    user_cache.init_app(app)
+    broker.init_app(app)
+    if cli or not production:
+        # Only the `flask db` commands need it, and it imports Alembic
+        from flask_migrate import Migrate
+        migrate = Migrate(app, db)
     jwt = JWTManager(app)
     api = Api(app)
     CORS(app)  # Enable CORS for Flutter
+    init_compression(app)
+    init_profiling(app)  # no-op unless PROFILING_ENABLED
     
     # JWT error handlers
     @jwt.expired_token_loader
@@ -39,16 +54,57 @@ def create_app():
     def missing_token_callback(error):
         return {"message": "Authorization token required.", "error": "authorization_required"}, 401
     
+    # Tokens of deleted accounts stop working within USER_REVOCATION_MAX_AGE
+    @jwt.token_in_blocklist_loader
+    def deleted_user_callback(jwt_header, jwt_payload):
+        max_age = app.config["USER_REVOCATION_MAX_AGE"]
+        return user_cache.get(int(jwt_payload["sub"]), max_age=max_age) is None
+    
+    @jwt.revoked_token_loader
+    def revoked_token_callback(jwt_header, jwt_payload):
+        return {"message": "This account has been deleted.", "error": "account_deleted"}, 401
+    
     # Register blueprints
+    from resources import (
+        UserBlueprint,
+        TimetableBlueprint,
+        AssignmentBlueprint,
+        ExamBlueprint,
+        NotesBlueprint as NoteBlueprint,
+        EventsBlueprint,
+        BatchBlueprint,
+        AgendaBlueprint,
+        ImportBlueprint,
+        ProfileBlueprint,
+    )
     api.register_blueprint(UserBlueprint)
     api.register_blueprint(TimetableBlueprint)
     api.register_blueprint(AssignmentBlueprint)
     api.register_blueprint(ExamBlueprint)
     api.register_blueprint(NoteBlueprint)
+    api.register_blueprint(EventsBlueprint)
+    api.register_blueprint(BatchBlueprint)
+    api.register_blueprint(AgendaBlueprint)
+    api.register_blueprint(ImportBlueprint)
+    api.register_blueprint(ProfileBlueprint)
+    
+    # Migrate owns the schema in production, so only check its version there
+    # (not under the flask CLI, which is how `flask db upgrade` gets run)
+    if production:
+        if not cli:
+            check_migration_version(app)
+    else:
+        with app.app_context():
+            # The models have no bind keys; the shards get the same tables
+            db.create_all(bind_key=None)
+            for key in shards.keys:
+                db.metadata.create_all(db.engines[key])
     
-    # Create database tables
-    with app.app_context():
-        db.create_all()
+    init_jobs(app)
+    init_purger(app)
+    init_archiver(app)
+    from importer import init_importer  # imports the resource schemas
+    init_importer(app)
     
     return app
 
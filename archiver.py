@@ -0,0 +1,64 @@
+from datetime import datetime, timedelta
+
+import click
+from sqlalchemy import delete, insert, literal, select
+
+from db import db
+from jobs import on_every_database, run_periodically
+from models import AssignmentModel, ExamModel, AssignmentArchiveModel, ExamArchiveModel
+
+
+def _move(model, archive, condition, batch_size):
+    """Move rows matching ``condition`` into the archive table, one
+    transaction per batch. Returns the number of rows moved."""
+    table = model.__table__
+    names = [column.name for column in table.columns]
+    moved = 0
+    while True:
+        ids = db.session.execute(
+            select(table.c.id)
+            .where(condition, table.c.deleted_at.is_(None))
+            .order_by(table.c.id)
+            .limit(batch_size)
+        ).scalars().all()
+        if not ids:
+            return moved
+
+        now = datetime.utcnow()
+        rows = select(*(table.c[name] for name in names), literal(now)).where(table.c.id.in_(ids))
+        db.session.execute(insert(archive.__table__).from_select(names + ["archived_at"], rows))
+        db.session.execute(delete(table).where(table.c.id.in_(ids)))
+        db.session.commit()
+        moved += len(ids)
+
+
+def archive_old(after_days=180, batch_size=500):
+    """Archive completed assignments and exams that are more than
+    ``after_days`` days in the past. Returns the number of rows moved."""
+    horizon = datetime.utcnow() - timedelta(days=after_days)
+    moved = _move(
+        AssignmentModel,
+        AssignmentArchiveModel,
+        (AssignmentModel.status == "completed") & (AssignmentModel.due_date < horizon),
+        batch_size,
+    )
+    moved += _move(ExamModel, ExamArchiveModel, ExamModel.exam_date < horizon, batch_size)
+    return moved
+
+
+def init_archiver(app):
+    """Register the archive command and the periodic archiver"""
+
+    @app.cli.command("archive")
+    @click.option("--after-days", type=int, default=None, help="Defaults to ARCHIVE_AFTER_DAYS.")
+    def archive_command(after_days):
+        """Move old completed assignments and past exams to the archive tables."""
+        if after_days is None:
+            after_days = app.config["ARCHIVE_AFTER_DAYS"]
+        moved = on_every_database(archive_old, after_days, app.config["ARCHIVE_BATCH_SIZE"])
+        click.echo(f"Archived {moved} rows.")
+
+    run_periodically(
+        app, "archiver", app.config["ARCHIVE_INTERVAL"],
+        archive_old, app.config["ARCHIVE_AFTER_DAYS"], app.config["ARCHIVE_BATCH_SIZE"],
+    )
@@ -0,0 +1,63 @@
+"""Startup-time benchmark for create_app().
+
+Boots the app in fresh interpreters in both startup modes against a
+throwaway SQLite database and prints the timings.
+
+    python bench_startup.py [runs]
+"""
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+BOOT = """
+import time
+start = time.perf_counter()
+from app import create_app
+app = create_app()
+booted = time.perf_counter()
+app.test_client().get("/openapi.json")
+print(booted - start, time.perf_counter() - booted)
+"""
+
+SETUP = """
+from flask_migrate import stamp
+from app import create_app
+app = create_app()
+with app.app_context():
+    stamp()
+"""
+
+
+def run(code, env):
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=HERE, env=env,
+        capture_output=True, text=True, check=True,
+    )
+    return result.stdout
+
+
+def main(runs=5):
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, DATABASE_URL=f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        # create_all() + stamp so the production version check passes
+        run(SETUP, dict(env, STARTUP_MODE="development"))
+
+        for mode in ("development", "production"):
+            boots, specs = [], []
+            for _ in range(runs):
+                boot, spec = map(float, run(BOOT, dict(env, STARTUP_MODE=mode)).split())
+                boots.append(boot * 1000)
+                specs.append(spec * 1000)
+            print(
+                f"{mode:<12} create_app: {statistics.median(boots):7.1f} ms"
+                f"   first /openapi.json: {statistics.median(specs):7.1f} ms"
+                f"   (median of {runs})"
+            )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
@@ -0,0 +1,242 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+from flask import g, has_app_context
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.orm import object_session
+
+from db import db
+from models.user import UserModel
+
+MISSING = object()
+
+
+class LocalCache:
+    """Thread-safe in-process cache with a TTL and LRU eviction"""
+
+    def __init__(self, max_size=10000, ttl=60):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, max_age=None):
+        """Return the value, or MISSING if it has expired or, with
+        ``max_age``, was stored more than ``max_age`` seconds ago"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return MISSING
+            stored, value = entry
+            age = time.monotonic() - stored
+            if age > self.ttl:
+                del self._data[key]
+                return MISSING
+            if max_age is not None and age > max_age:
+                return MISSING
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class RedisCache:
+    """Cache shared by all workers, stored as JSON in Redis.
+
+    Deletions are also published on a pub/sub channel, so every worker can
+    drop its own copy of the key (see listen()).
+    """
+
+    def __init__(self, url, ttl=60, prefix="planner:"):
+        import redis  # optional dependency, only needed for this backend
+
+        self.client = redis.Redis.from_url(url)
+        self.ttl = ttl
+        self.prefix = prefix
+        self.channel = prefix + "invalidate"
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        raw = self.client.get(self.prefix + key)
+        return MISSING if raw is None else json.loads(raw)
+
+    def set(self, key, value):
+        self.client.set(self.prefix + key, json.dumps(value), ex=self.ttl)
+
+    def delete(self, key):
+        self.client.delete(self.prefix + key)
+        self.client.publish(self.channel, key)
+
+    def clear(self):
+        for key in self.client.scan_iter(self.prefix + "*"):
+            self.client.delete(key)
+
+    def listen(self, local):
+        """Start this process's subscriber (again after a fork), which drops
+        keys deleted by any worker from ``local``"""
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            threading.Thread(target=self._listen, args=(local,), name="cache-invalidator", daemon=True).start()
+
+    def _listen(self, local):
+        while True:
+            try:
+                pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                # Deletions published while unsubscribed are lost
+                local.clear()
+                for message in pubsub.listen():
+                    local.delete(message["data"].decode())
+            except Exception:
+                time.sleep(1)
+
+
+class UserCache:
+    """Read-through cache of user records.
+
+    Lookups go through the current request's identity map, then this
+    worker's LocalCache, then the optional shared backend, and only then the
+    database. Records are plain dicts (None for users that don't exist or
+    were deleted) and are invalidated when a change to a UserModel row is
+    committed.
+
+    Only the Redis backend tells the other workers about an invalidation;
+    without it their LocalCache copies live until USER_CACHE_TTL, or as
+    long as the caller's ``max_age`` allows.
+    """
+
+    def __init__(self, app=None):
+        self.local = None
+        self.shared = None
+        self.broadcast = False  # invalidations reach every worker
+        self._counts = {"request": 0, "local": 0, "shared": 0, "database": 0}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        ttl = app.config["USER_CACHE_TTL"]
+        self.local = LocalCache(app.config["USER_CACHE_MAX_SIZE"], ttl)
+
+        backend = app.config["USER_CACHE_SHARED_BACKEND"]
+        self.broadcast = backend == "redis"
+        if backend == "redis":
+            self.shared = RedisCache(app.config["USER_CACHE_REDIS_URL"], ttl)
+        elif backend == "local":
+            # In-process stand-in for a shared cache (tests, single worker)
+            self.shared = LocalCache(app.config["USER_CACHE_MAX_SIZE"], ttl)
+        else:
+            self.shared = None
+
+    def get(self, user_id, max_age=None):
+        """Return the record of an active user, or None.
+
+        ``max_age`` bounds how late a change made by another worker may be
+        seen (token revocation): this worker's copy is only used if it was
+        stored less than ``max_age`` seconds ago. It is ignored when
+        invalidations are broadcast.
+        """
+        identity_map = g.setdefault("_user_records", {}) if has_app_context() else {}
+        if user_id in identity_map:
+            self._counts["request"] += 1
+            return _load(identity_map[user_id])
+
+        if self.broadcast:
+            self.shared.listen(self.local)
+        key = f"user:{user_id}"
+        record = self.local.get(key, None if self.broadcast else max_age)
+        if record is not MISSING:
+            self._counts["local"] += 1
+        elif self.shared is not None and (record := self.shared.get(key)) is not MISSING:
+            self._counts["shared"] += 1
+            self.local.set(key, record)
+        else:
+            self._counts["database"] += 1
+            record = _dump(db.session.get(UserModel, user_id))
+            self.local.set(key, record)
+            if self.shared is not None:
+                self.shared.set(key, record)
+
+        identity_map[user_id] = record
+        return _load(record)
+
+    def invalidate(self, user_id):
+        if has_app_context():
+            g.get("_user_records", {}).pop(user_id, None)
+        key = f"user:{user_id}"
+        self.local.delete(key)
+        if self.shared is not None:
+            self.shared.delete(key)
+
+    def stats(self):
+        """Lookup counts per level and the overall hit rate"""
+        lookups = sum(self._counts.values())
+        hits = lookups - self._counts["database"]
+        return {
+            "hits": {level: count for level, count in self._counts.items() if level != "database"},
+            "misses": self._counts["database"],
+            "hit_rate": hits / lookups if lookups else 0.0,
+        }
+
+
+def _dump(user):
+    if user is None:
+        return None
+    return {
+        "id": user.id,
+        "username": user.username,
+        "email": user.email,
+        "created_at": user.created_at.isoformat() if user.created_at else None,
+    }
+
+
+def _load(record):
+    if record is None:
+        return None
+    created_at = record["created_at"]
+    return dict(record, created_at=datetime.fromisoformat(created_at) if created_at else None)
+
+
+user_cache = UserCache()
+
+
+@event.listens_for(UserModel, "after_insert")
+@event.listens_for(UserModel, "after_update")
+@event.listens_for(UserModel, "after_delete")
+def _collect_changed_user(mapper, connection, target):
+    """Note the user for invalidation once the transaction commits; until
+    then other workers would only re-cache the old row"""
+    object_session(target).info.setdefault("changed_users", set()).add(target.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_users(session):
+    for user_id in session.info.pop("changed_users", ()):
+        user_cache.invalidate(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_changed_users(session):
+    session.info.pop("changed_users", None)
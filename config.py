@@ -11,7 +11,76 @@ class Config:
     
     SQLALCHEMY_DATABASE_URI = database_url
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    # "production" skips db.create_all() (checks the Alembic version instead)
+    # and only loads Flask-Migrate/Alembic under the flask CLI
+    STARTUP_MODE = os.getenv("STARTUP_MODE", "development")
     JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", "super-secret-key-change-in-production")
+    # Response compression (brotli is used when installed, gzip otherwise)
+    COMPRESS_ENABLED = os.getenv("COMPRESS_ENABLED", "true").lower() == "true"
+    COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", 1024))
+    COMPRESS_GZIP_LEVEL = 6
+    COMPRESS_BR_LEVEL = 5
+    # Periodic jobs (purger, archiver) run in every process that has
+    # BACKGROUND_JOBS set; keep it to one, or run `flask jobs` on its own
+    BACKGROUND_JOBS = os.getenv("BACKGROUND_JOBS", "true").lower() == "true"
+    # Soft-deleted rows are removed by a background purger every PURGE_INTERVAL
+    # seconds (0 disables it; `flask purge-deleted` runs it once)
+    PURGE_INTERVAL = int(os.getenv("PURGE_INTERVAL", 300))
+    PURGE_BATCH_SIZE = int(os.getenv("PURGE_BATCH_SIZE", 500))
+    # User record cache: per-worker TTL/LRU, optionally backed by a shared
+    # cache ("redis", or "local" as an in-process stand-in)
+    USER_CACHE_TTL = int(os.getenv("USER_CACHE_TTL", 60))
+    USER_CACHE_MAX_SIZE = int(os.getenv("USER_CACHE_MAX_SIZE", 10000))
+    USER_CACHE_SHARED_BACKEND = os.getenv("USER_CACHE_SHARED_BACKEND", "none")
+    USER_CACHE_REDIS_URL = os.getenv("USER_CACHE_REDIS_URL", "redis://localhost:6379/0")
+    # Without Redis, a token of an account deleted through another worker
+    # keeps working for up to this many seconds
+    USER_REVOCATION_MAX_AGE = float(os.getenv("USER_REVOCATION_MAX_AGE", 5))
+    # Change notifications (/events, /events/poll); set EVENTS_BACKEND=postgres
+    # to fan events out to every worker with LISTEN/NOTIFY
+    EVENTS_BACKEND = os.getenv("EVENTS_BACKEND", "local")
+    EVENTS_HISTORY_SIZE = 100
+    EVENTS_MAX_USERS = 10000
+    EVENTS_HEARTBEAT = 15
+    EVENTS_STREAM_TIMEOUT = int(os.getenv("EVENTS_STREAM_TIMEOUT", 300))
+    # Idempotency-Key responses are replayed for IDEMPOTENCY_TTL seconds;
+    # concurrent duplicates wait up to IDEMPOTENCY_WAIT for the first one. A
+    # first request still unfinished after IDEMPOTENCY_LEASE seconds is taken
+    # to have died, and a retry runs instead (keep it above gunicorn's timeout)
+    IDEMPOTENCY_TTL = int(os.getenv("IDEMPOTENCY_TTL", 24 * 3600))
+    IDEMPOTENCY_WAIT = 10
+    IDEMPOTENCY_LEASE = int(os.getenv("IDEMPOTENCY_LEASE", 60))
+    # Cost limits of POST /query: slices per request, rows per slice, and
+    # rows across all slices
+    BATCH_MAX_QUERIES = int(os.getenv("BATCH_MAX_QUERIES", 10))
+    BATCH_MAX_LIMIT = int(os.getenv("BATCH_MAX_LIMIT", 200))
+    BATCH_MAX_ROWS = int(os.getenv("BATCH_MAX_ROWS", 1000))
+    # Materialized agenda weeks are rebuilt when their rows change; this
+    # bounds how long one built concurrently with a change can stay stale
+    AGENDA_MAX_AGE = int(os.getenv("AGENDA_MAX_AGE", 3600))
+    # Comma-separated shard database URLs; empty disables sharding. Only
+    # append to the list (then run `flask shards rebalance`)
+    SHARD_URLS = [url.strip() for url in os.getenv("SHARD_URLS", "").split(",") if url.strip()]
+    SHARD_REPLICAS = 64  # points per shard on the consistent hash ring
+    # Completed assignments and exams older than ARCHIVE_AFTER_DAYS are moved
+    # to the archive tables every ARCHIVE_INTERVAL seconds (0 disables)
+    ARCHIVE_AFTER_DAYS = int(os.getenv("ARCHIVE_AFTER_DAYS", 180))
+    ARCHIVE_INTERVAL = int(os.getenv("ARCHIVE_INTERVAL", 3600))
+    ARCHIVE_BATCH_SIZE = 500
+    # Bulk imports are validated and committed IMPORT_CHUNK_SIZE rows at a
+    # time, and stop after IMPORT_MAX_ERRORS invalid rows (0: never)
+    IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", 1000))
+    IMPORT_MAX_ERRORS = int(os.getenv("IMPORT_MAX_ERRORS", 1000))
+    # Opt-in sampling profiler: PROFILING_SAMPLE_RATE of the requests, plus
+    # those signed with PROFILING_SECRET (see `flask profile-token`), are
+    # sampled every PROFILING_INTERVAL seconds. Results are served to
+    # ADMIN_EMAILS (who also see /cache/stats) at /admin/profile
+    PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+    PROFILING_SAMPLE_RATE = float(os.getenv("PROFILING_SAMPLE_RATE", 0.01))
+    PROFILING_SECRET = os.getenv("PROFILING_SECRET", "")
+    PROFILING_INTERVAL = 0.005
+    PROFILING_MAX_STACKS = 5000  # distinct stacks kept per endpoint
+    ADMIN_EMAILS = [email.strip() for email in os.getenv("ADMIN_EMAILS", "").split(",") if email.strip()]
     API_TITLE = "Student Planner API"
     API_VERSION = "v1"
     OPENAPI_VERSION = "3.0.3"
@@ -1,3 +1,31 @@
+import sqlite3
+
+from flask import current_app, has_app_context
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class RoutingSession(Session):
+    """Session that lets the sharding layer (sharding.py), when enabled, pick
+    the engine for each statement"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and has_app_context():
+            router = current_app.extensions.get("sharding")
+            if router is not None:
+                bind = router.get_bind(mapper, clause)
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+db = SQLAlchemy(session_options={"class_": RoutingSession})
+
 
-db = SQLAlchemy()
+@event.listens_for(Engine, "connect")
+def _enable_sqlite_foreign_keys(dbapi_connection, connection_record):
+    """SQLite only enforces foreign keys (and ON DELETE CASCADE) when asked to"""
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
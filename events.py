@@ -0,0 +1,171 @@
+import json
+import os
+import select
+import threading
+import time
+from collections import OrderedDict, deque
+
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event as sa_event
+
+from db import db
+
+
+class EventBroker:
+    """In-process pub/sub of per-user change events.
+
+    Every worker keeps a short history of recent events per user, so both
+    long-poll clients (which reconnect between polls) and SSE clients
+    (Last-Event-ID) can resume where they left off. Waiting clients block on
+    a per-user condition and cost nothing until an event for them arrives.
+
+    With a cross-worker backend, events are published to the backend and
+    delivered to every worker (including this one) by its listener.
+    """
+
+    def __init__(self, app=None):
+        self.history_size = 100
+        self.max_users = 10000
+        self.backend = None
+        self._last_id = 0
+        self._lock = threading.Lock()
+        self._users = OrderedDict()  # user_id -> (deque of events, Condition)
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.history_size = app.config["EVENTS_HISTORY_SIZE"]
+        self.max_users = app.config["EVENTS_MAX_USERS"]
+
+        backend = app.config["EVENTS_BACKEND"]
+        if backend == "postgres":
+            self.backend = PostgresNotifyBackend(self, app)
+        else:
+            self.backend = None
+
+    def publish(self, user_id, collection, action, item_id):
+        """Announce that an item of a user's collection changed.
+        Call after the change has been committed."""
+        event = {
+            "id": time.time_ns() // 1000,  # proposed; deliver() has the final say
+            "user_id": user_id,
+            "collection": collection,
+            "action": action,
+            "item_id": item_id,
+        }
+        if self.backend is not None:
+            self.backend.publish(event)
+        else:
+            self.deliver(event)
+
+    def publish_on_commit(self, user_id, collection, action, item_id):
+        """publish() once the current transaction commits (nothing is
+        published if it rolls back), for changes that are only flushed"""
+        db.session.info.setdefault("events", []).append((user_id, collection, action, item_id))
+
+    def deliver(self, event):
+        """Hand an event to this worker's waiting clients.
+
+        Ids increase in delivery order, so a client that has seen an id has
+        seen everything before it: the proposed id (microseconds, the same in
+        every worker for an event fanned out by the backend) is bumped past
+        the last one delivered when events arrive out of order.
+        """
+        with self._lock:
+            event["id"] = max(event["id"], self._last_id + 1)
+            self._last_id = event["id"]
+            history, condition = self._user_entry(event["user_id"])
+            history.append(event)
+            condition.notify_all()
+
+    def wait(self, user_id, since, timeout):
+        """Events newer than ``since``, waiting up to ``timeout`` seconds for
+        one to arrive. Returns None when ``since`` fell out of the history."""
+        if self.backend is not None:
+            self.backend.start()
+
+        deadline = time.monotonic() + timeout
+        with self._lock:
+            history, condition = self._user_entry(user_id)
+            while True:
+                if since and history and history[0]["id"] > since and len(history) == history.maxlen:
+                    return None
+                events = [event for event in history if event["id"] > (since or 0)]
+                remaining = deadline - time.monotonic()
+                if events or remaining <= 0:
+                    return events
+                condition.wait(remaining)
+
+    def last_id(self, user_id):
+        with self._lock:
+            history, _ = self._user_entry(user_id)
+            return history[-1]["id"] if history else 0
+
+    def _user_entry(self, user_id):
+        entry = self._users.get(user_id)
+        if entry is None:
+            entry = (deque(maxlen=self.history_size), threading.Condition(self._lock))
+            self._users[user_id] = entry
+            while len(self._users) > self.max_users:
+                self._users.popitem(last=False)
+        else:
+            self._users.move_to_end(user_id)
+        return entry
+
+
+class PostgresNotifyBackend:
+    """Fan events out to every worker with Postgres LISTEN/NOTIFY"""
+
+    channel = "planner_events"
+
+    def __init__(self, broker, app):
+        self.broker = broker
+        self.app = app
+        self._pid = None
+        self._lock = threading.Lock()
+
+    def publish(self, event):
+        self.start()
+        with db.engine.begin() as connection:
+            connection.execute(
+                db.text("SELECT pg_notify(:channel, :payload)"),
+                {"channel": self.channel, "payload": json.dumps(event)},
+            )
+
+    def start(self):
+        """Start this process's listener (again after a fork)"""
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            threading.Thread(target=self._listen, name="events-listener", daemon=True).start()
+
+    def _listen(self):
+        with self.app.app_context():
+            pooled = db.engine.raw_connection()  # held for the life of the thread
+        connection = pooled.driver_connection
+        connection.set_isolation_level(0)  # autocommit, required by LISTEN
+        cursor = connection.cursor()
+        cursor.execute(f"LISTEN {self.channel}")
+        while True:
+            if select.select([connection], [], [], 60) == ([], [], []):
+                continue
+            connection.poll()
+            while connection.notifies:
+                self.broker.deliver(json.loads(connection.notifies.pop(0).payload))
+
+
+broker = EventBroker()
+
+
+@sa_event.listens_for(Session, "after_commit")
+def _publish_committed_events(session):
+    for args in session.info.pop("events", ()):
+        broker.publish(*args)
+
+
+@sa_event.listens_for(Session, "after_rollback")
+def _drop_rolled_back_events(session):
+    session.info.pop("events", None)
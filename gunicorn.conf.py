@@ -0,0 +1,42 @@
+# Gunicorn settings (picked up automatically from the working directory)
+import os
+
+# Build the app once in the master and fork it into the workers
+preload_app = os.getenv("GUNICORN_PRELOAD", "true").lower() == "true"
+
+# Periodic jobs start in the master when it builds the app. The workers
+# don't run them: threads don't survive the fork, and gevent's greenlets
+# do but stop themselves (see jobs._start()). Without preload every
+# worker would start its own, so leave them to `flask jobs`
+if not preload_app:
+    os.environ.setdefault("BACKGROUND_JOBS", "false")
+
+# Idle /events and /events/poll clients are greenlets sleeping on a
+# condition, so a worker holds thousands of them next to normal traffic
+# (GUNICORN_WORKER_CLASS=gthread gives each client a thread instead)
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gevent")
+worker_connections = int(os.getenv("GUNICORN_WORKER_CONNECTIONS", 2000))
+threads = int(os.getenv("GUNICORN_THREADS", 32))
+
+if worker_class == "gevent":
+    # Patch before the app is preloaded, so its locks, threads and sockets
+    # are gevent's in the workers, and make psycopg2 wait cooperatively
+    from gevent import monkey
+    from psycogreen.gevent import patch_psycopg
+
+    monkey.patch_all()
+    patch_psycopg()
+
+
+def post_fork(server, worker):
+    """Drop any database connections inherited from the master process,
+    including the shard engines' (the master's background jobs use them)"""
+    if not server.cfg.preload_app:
+        return
+
+    from wsgi import app
+    from db import db
+
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
@@ -0,0 +1,276 @@
+import csv
+import io
+from datetime import datetime
+from itertools import islice
+
+import click
+from marshmallow import ValidationError
+from sqlalchemy import insert
+
+from agenda import drop_weeks
+from db import db
+from models import UserModel, TimetableModel, ExamModel
+from resources.exam_routes import ExamSchema
+from resources.timetable_routes import TimetableSchema
+from sharding import shards
+
+# kind -> (model, schema, date column whose weeks change in the agenda)
+IMPORTS = {
+    "timetable": (TimetableModel, TimetableSchema, None),
+    "exams": (ExamModel, ExamSchema, "exam_date"),
+}
+
+ICS_DAYS = {"MO": "Monday", "TU": "Tuesday", "WE": "Wednesday", "TH": "Thursday",
+            "FR": "Friday", "SA": "Saturday", "SU": "Sunday"}
+
+
+def read_csv(stream):
+    """Yield (line number, row) from a CSV text stream with a header row"""
+    reader = csv.DictReader(stream)
+    for row in reader:
+        yield reader.line_num, row
+
+
+def read_ics(stream, kind):
+    """Yield (line number, row) for each VEVENT of an iCalendar text stream.
+
+    Exams take DTSTART, SUMMARY, LOCATION, DESCRIPTION and CATEGORIES (the
+    exam type). Timetable entries take their day(s) from RRULE BYDAY, else
+    from DTSTART, and their times from DTSTART/DTEND.
+    """
+    event, start_line = None, 0
+    for line_number, name, params, value in _ics_properties(stream):
+        if name == "BEGIN" and value.upper() == "VEVENT":
+            event, start_line = {}, line_number
+        elif name == "END" and value.upper() == "VEVENT" and event is not None:
+            yield from _ics_rows(start_line, event, kind)
+            event = None
+        elif event is not None:
+            event[name] = (params, value)
+
+
+def _ics_properties(stream):
+    """Unfold continuation lines and split them into name, parameters, value"""
+    pending, pending_line = None, 0
+    for line_number, line in enumerate(stream, 1):
+        line = line.rstrip("\r\n")
+        if line[:1] in (" ", "\t") and pending is not None:
+            pending += line[1:]
+            continue
+        if pending:
+            yield (pending_line, *_ics_split(pending))
+        pending, pending_line = line, line_number
+    if pending:
+        yield (pending_line, *_ics_split(pending))
+
+
+def _ics_split(line):
+    head, _, value = line.partition(":")
+    name, *params = head.split(";")
+    return name.upper(), dict(param.partition("=")[::2] for param in params), value
+
+
+def _ics_text(value):
+    return value.replace("\\n", "\n").replace("\\N", "\n").replace("\\,", ",").replace("\\;", ";").replace("\\\\", "\\")
+
+
+def _ics_datetime(value):
+    value = value.rstrip("Z")
+    return datetime.strptime(value, "%Y%m%dT%H%M%S" if "T" in value else "%Y%m%d")
+
+
+def _ics_rows(line_number, event, kind):
+    text = {name: _ics_text(value) for name, (_, value) in event.items()}
+    try:
+        start = _ics_datetime(event["DTSTART"][1]) if "DTSTART" in event else None
+        end = _ics_datetime(event["DTEND"][1]) if "DTEND" in event else None
+    except ValueError:
+        start = end = None
+
+    if kind == "exams":
+        yield line_number, {
+            "subject": text.get("SUMMARY", ""),
+            "exam_type": (text.get("CATEGORIES") or "exam").split(",")[0].lower(),
+            "exam_date": start.isoformat() if start else text.get("DTSTART", ""),
+            "room": text.get("LOCATION", ""),
+            "notes": text.get("DESCRIPTION", ""),
+        }
+        return
+
+    rule = dict(part.partition("=")[::2] for part in text.get("RRULE", "").split(";") if part)
+    days = [ICS_DAYS.get(day[-2:].upper(), day) for day in rule.get("BYDAY", "").split(",") if day]
+    if not days and start:
+        days = [start.strftime("%A")]
+    for day in days or [""]:
+        yield line_number, {
+            "subject": text.get("SUMMARY", ""),
+            "day": day,
+            "start_time": start.strftime("%H:%M") if start else "",
+            "end_time": end.strftime("%H:%M") if end else "",
+            "room": text.get("LOCATION", ""),
+            "teacher": _ics_organizer(event.get("ORGANIZER")),
+        }
+
+
+def _ics_organizer(prop):
+    """Common name of an ORGANIZER, else the address"""
+    if prop is None:
+        return ""
+    params, value = prop
+    return params.get("CN", "").strip('"') or value.rpartition(":")[2]
+
+
+def import_rows(kind, rows, user_id=None, chunk_size=1000, max_errors=1000):
+    """Validate and insert parsed rows in fixed-size chunks, one transaction
+    per chunk. Yields a progress report after each chunk.
+
+    With ``user_id`` every row belongs to that user; otherwise each row names
+    its owner in a ``user_id`` or ``email`` column. Only the current chunk
+    is held in memory, so inputs of any size stream through. Stops after
+    ``max_errors`` invalid rows (0 for no limit).
+    """
+    model, schema_class, date_column = IMPORTS[kind]
+    schema = schema_class()
+    processed = imported = error_count = 0
+    rows = iter(rows)
+
+    while chunk := list(islice(rows, chunk_size)):
+        records, errors = _validate(schema, chunk, user_id)
+        _write(model, date_column, records)
+        db.session.commit()
+
+        processed += len(chunk)
+        imported += len(records)
+        error_count += len(errors)
+        aborted = bool(max_errors) and error_count >= max_errors
+        yield {
+            "processed": processed,
+            "imported": imported,
+            "error_count": error_count,
+            "errors": errors,
+            "done": aborted,
+            "aborted": aborted,
+        }
+        if aborted:
+            return
+
+    yield {"processed": processed, "imported": imported, "error_count": error_count,
+           "errors": [], "done": True, "aborted": False}
+
+
+def _validate(schema, chunk, user_id):
+    """Validated records of a chunk, and the errors of its invalid rows"""
+    payloads, owners, lines, errors = [], [], [], []
+    # CSV cells are strings; empty ones mean "not given"
+    chunk = [
+        (line, {key.strip(): value.strip() for key, value in row.items()
+                if key and isinstance(value, str) and value.strip()})
+        for line, row in chunk
+    ]
+
+    if user_id is None:
+        # One directory lookup per chunk for the owners it names
+        emails = {row["email"] for _, row in chunk if "email" in row}
+        ids = {int(row["user_id"]) for _, row in chunk if row.get("user_id", "").isdigit()}
+        users = db.session.query(UserModel.id, UserModel.email).filter(
+            UserModel.email.in_(emails) | UserModel.id.in_(ids)
+        ).all() if emails or ids else []
+        known_ids = {id for id, _ in users}
+        ids_by_email = {email: id for id, email in users}
+
+    for line, row in chunk:
+        owner = user_id
+        if owner is None:
+            email = row.pop("email", None)
+            raw_id = row.pop("user_id", None)
+            owner = int(raw_id) if raw_id and raw_id.isdigit() else ids_by_email.get(email)
+            if owner not in known_ids:
+                errors.append({"line": line, "errors": {"user": ["Unknown user; give user_id or email."]}})
+                continue
+        payloads.append(row)
+        owners.append(owner)
+        lines.append(line)
+
+    try:
+        loaded = schema.load(payloads, many=True)
+        invalid = {}
+    except ValidationError as err:
+        loaded, invalid = err.valid_data, err.messages
+
+    records = []
+    for index, (data, owner) in enumerate(zip(loaded, owners)):
+        if index in invalid:
+            errors.append({"line": lines[index], "errors": invalid[index]})
+        else:
+            records.append(dict(data, user_id=owner))
+    errors.sort(key=lambda error: error["line"])
+    return records, errors
+
+
+def _write(model, date_column, records):
+    """executemany() per shard (a single group without sharding)"""
+    groups = {}
+    for record in records:
+        key = shards.shard_for(record["user_id"]) if shards.enabled else None
+        groups.setdefault(key, []).append(record)
+
+    for key, group in groups.items():
+        with shards.use_shard(key):
+            db.session.execute(insert(model.__table__), group)
+            # The inserts bypass the ORM events that refresh the agenda
+            owners = {}
+            for record in group:
+                owners.setdefault(record["user_id"], []).append(record.get(date_column))
+            for owner, dates in owners.items():
+                drop_weeks(owner, dates if date_column else None)
+
+
+def open_text(stream):
+    """Text view of a binary stream, tolerating a UTF-8 byte order mark"""
+    return io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+
+
+def parse(kind, stream, fmt):
+    if fmt == "ics":
+        return read_ics(stream, kind)
+    return read_csv(stream)
+
+
+def init_importer(app):
+    """Register the import commands"""
+
+    @app.cli.command("import")
+    @click.argument("kind", type=click.Choice(list(IMPORTS)))
+    @click.argument("path", type=click.Path(exists=True, dir_okay=False))
+    @click.option("--format", "fmt", type=click.Choice(["csv", "ics"]), default=None,
+                  help="Defaults to the file extension.")
+    @click.option("--user", "email", default=None, help="Email of the owner of every row.")
+    def import_command(kind, path, fmt, email):
+        """Import timetable entries or exams from a CSV or ICS file.
+
+        CSV files have a header row with the fields of the API (plus user_id
+        or email per row unless --user is given).
+        """
+        fmt = fmt or ("ics" if path.lower().endswith(".ics") else "csv")
+        user_id = None
+        if email:
+            user = UserModel.query.filter_by(email=email).first()
+            if user is None:
+                raise click.BadParameter(f"No user with email {email}.", param_hint="--user")
+            user_id = user.id
+
+        with open(path, "rb") as raw:
+            reports = import_rows(
+                kind,
+                parse(kind, open_text(raw), fmt),
+                user_id,
+                app.config["IMPORT_CHUNK_SIZE"],
+                app.config["IMPORT_MAX_ERRORS"],
+            )
+            for report in reports:
+                for error in report["errors"]:
+                    click.echo(f"line {error['line']}: {error['errors']}", err=True)
+                click.echo(f"{report['processed']} rows read, {report['imported']} imported, "
+                           f"{report['error_count']} invalid")
+                if report["aborted"]:
+                    raise click.ClickException("Too many invalid rows; import stopped.")
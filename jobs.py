@@ -0,0 +1,79 @@
+import os
+import threading
+import time
+
+import click
+
+from db import db
+from sharding import shards
+
+
+def on_every_database(job, *args):
+    """Run ``job(*args)`` on the database, then on every shard when sharding
+    is enabled. Returns the sum of the results (rows affected)."""
+    total = job(*args)
+    for key in shards.keys:
+        with shards.use_shard(key):
+            total += job(*args)
+    return total
+
+
+def run_periodically(app, name, interval, job, *args):
+    """Run ``job(*args)`` on every database (see on_every_database()) in an
+    app context every ``interval`` seconds (0 disables it).
+
+    The thread is started in this process only when BACKGROUND_JOBS is set;
+    otherwise the job waits for `flask jobs`, the dedicated process that runs
+    all of them.
+    """
+    if interval <= 0:
+        return
+    app.extensions.setdefault("jobs", {})[name] = (interval, lambda: on_every_database(job, *args), None)
+    if app.config["BACKGROUND_JOBS"]:
+        _start(app, name)
+
+
+def _start(app, name):
+    interval, job, thread = app.extensions["jobs"][name]
+    if thread is not None:
+        return thread
+
+    # Forked children inherit the loop when it is a greenlet (gevent
+    # workers with a preloaded app); only the starting process runs the
+    # job. The copies idle rather than return, as a thread that finishes
+    # after the fork isn't in threading's bookkeeping and logs a KeyError
+    owner = os.getpid()
+
+    def run():
+        while True:
+            time.sleep(interval)
+            if os.getpid() != owner:
+                continue
+            with app.app_context():
+                try:
+                    job()
+                except Exception:
+                    db.session.rollback()
+                    app.logger.exception("Background job %s failed", name)
+
+    thread = threading.Thread(target=run, name=name, daemon=True)
+    thread.start()
+    app.extensions["jobs"][name] = (interval, job, thread)
+    return thread
+
+
+def init_jobs(app):
+    """Register the jobs command"""
+
+    @app.cli.command("jobs")
+    def jobs_command():
+        """Run the periodic background jobs in the foreground.
+
+        For deployments where no web process has BACKGROUND_JOBS set.
+        """
+        threads = [_start(app, name) for name in app.extensions.get("jobs", {})]
+        if not threads:
+            raise click.ClickException("No background jobs are enabled.")
+        click.echo(f"Running {', '.join(thread.name for thread in threads)}")
+        for thread in threads:
+            thread.join()
@@ -16,6 +16,10 @@ logger = logging.getLogger('alembic.env')
 
 
 def get_engine():
+    # `flask shards upgrade` migrates each shard with -x shard=<bind key>
+    shard = context.get_x_argument(as_dictionary=True).get('shard')
+    if shard:
+        return current_app.extensions['migrate'].db.engines[shard]
     try:
         # this works with Flask-SQLAlchemy<3 and Alchemical
         return current_app.extensions['migrate'].db.get_engine()
@@ -0,0 +1,90 @@
+"""Compressed note bodies with stored previews
+
+Revision ID: 7e1c4b9a2f60
+Revises: d5a8e3f47b19
+Create Date: 2026-10-19 12:34:08.921544
+
+"""
+import zlib
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7e1c4b9a2f60'
+down_revision = 'd5a8e3f47b19'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 500
+PREVIEW_LENGTH = 200
+THRESHOLD = 1024
+
+notes = sa.table(
+    'notes',
+    sa.column('id', sa.Integer),
+    sa.column('content', sa.Text),
+    sa.column('body', sa.LargeBinary),
+    sa.column('content_preview', sa.String),
+    sa.column('content_length', sa.Integer),
+)
+
+
+# Same encoding as models.types.CompressedText at the time of this revision
+def _encode(text):
+    data = text.encode('utf-8')
+    if len(data) > THRESHOLD:
+        return b'\x01' + zlib.compress(data, 6)
+    return b'\x00' + data
+
+
+def _decode(value):
+    value = bytes(value)
+    if value[:1] == b'\x01':
+        return zlib.decompress(value[1:]).decode('utf-8')
+    return value[1:].decode('utf-8')
+
+
+def _copy_in_batches(source, convert):
+    connection = op.get_bind()
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            sa.select(notes.c.id, source).where(notes.c.id > last_id).order_by(notes.c.id).limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            return
+        for note_id, value in rows:
+            connection.execute(notes.update().where(notes.c.id == note_id).values(**convert(value)))
+        last_id = rows[-1][0]
+
+
+def upgrade():
+    with op.batch_alter_table('notes', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('body', sa.LargeBinary(), nullable=True))
+        batch_op.add_column(sa.Column('content_preview', sa.String(length=PREVIEW_LENGTH), nullable=True))
+        batch_op.add_column(sa.Column('content_length', sa.Integer(), nullable=True))
+
+    _copy_in_batches(notes.c.content, lambda content: {
+        'body': _encode(content),
+        'content_preview': content[:PREVIEW_LENGTH],
+        'content_length': len(content),
+    })
+
+    with op.batch_alter_table('notes', schema=None) as batch_op:
+        batch_op.alter_column('body', existing_type=sa.LargeBinary(), nullable=False)
+        batch_op.drop_column('content')
+
+
+def downgrade():
+    with op.batch_alter_table('notes', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('content', sa.Text(), nullable=True))
+
+    _copy_in_batches(notes.c.body, lambda body: {'content': _decode(body)})
+
+    with op.batch_alter_table('notes', schema=None) as batch_op:
+        batch_op.alter_column('content', existing_type=sa.Text(), nullable=False)
+        batch_op.drop_column('content_length')
+        batch_op.drop_column('content_preview')
+        batch_op.drop_column('body')
@@ -0,0 +1,54 @@
+"""Soft-delete columns and ON DELETE CASCADE foreign keys
+
+Revision ID: 9c3f1a6d2b84
+Revises: 4b7e2d91c0a3
+Create Date: 2026-10-19 11:02:17.342918
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9c3f1a6d2b84'
+down_revision = '4b7e2d91c0a3'
+branch_labels = None
+depends_on = None
+
+CHILD_TABLES = ('timetables', 'assignments', 'exams', 'notes')
+
+# The initial migration left the user_id foreign keys unnamed; SQLite
+# reflects them without a name, so batch mode needs a naming convention
+naming_convention = {"fk": "fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s"}
+
+
+def _user_fk_name(table):
+    if op.get_context().dialect.name == 'sqlite':
+        return f'fk_{table}_user_id_users'
+    return f'{table}_user_id_fkey'
+
+
+def upgrade():
+    # users only gains a column, so it is never recreated (SQLite would
+    # otherwise run an implicit DELETE on it while foreign keys are enforced)
+    op.add_column('users', sa.Column('deleted_at', sa.DateTime(), nullable=True))
+    op.create_index('ix_users_deleted_at', 'users', ['deleted_at'], unique=False)
+
+    for table in CHILD_TABLES:
+        with op.batch_alter_table(table, schema=None, naming_convention=naming_convention) as batch_op:
+            batch_op.add_column(sa.Column('deleted_at', sa.DateTime(), nullable=True))
+            batch_op.create_index(f'ix_{table}_deleted_at', ['deleted_at'], unique=False)
+            batch_op.drop_constraint(_user_fk_name(table), type_='foreignkey')
+            batch_op.create_foreign_key(f'{table}_user_id_fkey', 'users', ['user_id'], ['id'], ondelete='CASCADE')
+
+
+def downgrade():
+    for table in reversed(CHILD_TABLES):
+        with op.batch_alter_table(table, schema=None, naming_convention=naming_convention) as batch_op:
+            batch_op.drop_constraint(f'{table}_user_id_fkey', type_='foreignkey')
+            batch_op.create_foreign_key(_user_fk_name(table), 'users', ['user_id'], ['id'])
+            batch_op.drop_index(f'ix_{table}_deleted_at')
+            batch_op.drop_column('deleted_at')
+
+    op.drop_index('ix_users_deleted_at', table_name='users')
+    op.drop_column('users', 'deleted_at')
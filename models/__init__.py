@@ -4,3 +4,6 @@ from models.timetable import TimetableModel
 from models.assignment import AssignmentModel
 from models.exam import ExamModel
 from models.notes import NoteModel
+from models.idempotency_key import IdempotencyKeyModel
+from models.agenda_week import AgendaWeekModel
+from models.archive import AssignmentArchiveModel, ExamArchiveModel
@@ -0,0 +1,17 @@
+from db import db
+
+class AgendaWeekModel(db.Model):
+    """Materialized agenda of one user's week, rebuilt from the timetable,
+    assignments and exams whenever it is missing"""
+    __tablename__ = "agenda_weeks"
+    __table_args__ = (
+        db.UniqueConstraint("user_id", "week_start", name="uq_agenda_weeks_user_id_week_start"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    week_start = db.Column(db.Date, nullable=False)  # Monday
+    slots = db.Column(db.JSON, nullable=False)  # sorted by start
+    unplaced = db.Column(db.JSON, nullable=False)  # timetable entries without a readable day/time
+    built_at = db.Column(db.DateTime, nullable=False)
+
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
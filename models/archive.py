@@ -0,0 +1,43 @@
+from db import db
+from models.soft_delete import SoftDeleteMixin
+
+# Same columns as the hot tables (ids included) plus archived_at, so list
+# queries can read both with a UNION ALL. Filled by archiver.py.
+
+class AssignmentArchiveModel(SoftDeleteMixin, db.Model):
+    __tablename__ = "assignments_archive"
+    __table_args__ = (
+        db.Index("ix_assignments_archive_user_id_due_date", "user_id", "due_date"),
+        db.Index("ix_assignments_archive_user_id_status_due_date", "user_id", "status", "due_date"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    title = db.Column(db.String(200), nullable=False)
+    subject = db.Column(db.String(100), nullable=False)
+    description = db.Column(db.Text)
+    due_date = db.Column(db.DateTime, nullable=False)
+    status = db.Column(db.String(20))
+    priority = db.Column(db.String(20))
+    created_at = db.Column(db.DateTime)
+    archived_at = db.Column(db.DateTime, nullable=False)
+
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
+
+
+class ExamArchiveModel(SoftDeleteMixin, db.Model):
+    __tablename__ = "exams_archive"
+    __table_args__ = (
+        db.Index("ix_exams_archive_user_id_exam_date", "user_id", "exam_date"),
+        db.Index("ix_exams_archive_user_id_exam_type_exam_date", "user_id", "exam_type", "exam_date"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    subject = db.Column(db.String(100), nullable=False)
+    exam_type = db.Column(db.String(50), nullable=False)
+    exam_date = db.Column(db.DateTime, nullable=False)
+    room = db.Column(db.String(50))
+    notes = db.Column(db.Text)
+    created_at = db.Column(db.DateTime)
+    archived_at = db.Column(db.DateTime, nullable=False)
+
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
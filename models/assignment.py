@@ -1,7 +1,15 @@
 from db import db
+from models.soft_delete import SoftDeleteMixin
 
-class AssignmentModel(db.Model):
+class AssignmentModel(SoftDeleteMixin, db.Model):
     __tablename__ = "assignments"
+    __table_args__ = (
+        db.Index("ix_assignments_user_id_due_date", "user_id", "due_date"),
+        db.Index("ix_assignments_user_id_status_due_date", "user_id", "status", "due_date"),
+        # Archived ids must never be handed out again (SQLite reuses the
+        # highest rowid without AUTOINCREMENT)
+        {"sqlite_autoincrement": True},
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(200), nullable=False)
@@ -12,5 +20,5 @@ class AssignmentModel(db.Model):
     priority = db.Column(db.String(20), default="medium")  # low, medium, high
     created_at = db.Column(db.DateTime, server_default=db.func.now())
 
-    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     user = db.relationship("UserModel", back_populates="assignments")
@@ -1,7 +1,15 @@
 from db import db
+from models.soft_delete import SoftDeleteMixin
 
-class ExamModel(db.Model):
+class ExamModel(SoftDeleteMixin, db.Model):
     __tablename__ = "exams"
+    __table_args__ = (
+        db.Index("ix_exams_user_id_exam_date", "user_id", "exam_date"),
+        db.Index("ix_exams_user_id_exam_type_exam_date", "user_id", "exam_type", "exam_date"),
+        # Archived ids must never be handed out again (SQLite reuses the
+        # highest rowid without AUTOINCREMENT)
+        {"sqlite_autoincrement": True},
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     subject = db.Column(db.String(100), nullable=False)
@@ -11,5 +19,5 @@ class ExamModel(db.Model):
     notes = db.Column(db.Text)
     created_at = db.Column(db.DateTime, server_default=db.func.now())
 
-    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     user = db.relationship("UserModel", back_populates="exams")
@@ -0,0 +1,17 @@
+from db import db
+
+class IdempotencyKeyModel(db.Model):
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (
+        db.UniqueConstraint("user_id", "key", name="uq_idempotency_keys_user_id_key"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    key = db.Column(db.String(255), nullable=False)
+    fingerprint = db.Column(db.String(64), nullable=False)  # sha256 of method, path and body
+    status_code = db.Column(db.Integer)  # NULL while the first request is still running
+    locked_at = db.Column(db.DateTime)  # when the running first request claimed the key
+    response_body = db.Column(db.Text)
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
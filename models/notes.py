@@ -1,13 +1,29 @@
 from db import db
+from models.soft_delete import SoftDeleteMixin
+from models.types import CompressedText
 
-class NoteModel(db.Model):
+PREVIEW_LENGTH = 200
+
+class NoteModel(SoftDeleteMixin, db.Model):
     __tablename__ = "notes"
+    __table_args__ = (
+        db.Index("ix_notes_user_id_created_at", "user_id", "created_at"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(100), nullable=False)
-    content = db.Column(db.Text, nullable=False)
+    # Stored compressed (column "body") and only loaded when accessed
+    content = db.deferred(db.Column("body", CompressedText(threshold=1024), nullable=False))
+    content_preview = db.Column(db.String(PREVIEW_LENGTH))
+    content_length = db.Column(db.Integer)
     created_at = db.Column(db.DateTime, server_default=db.func.now())
     updated_at = db.Column(db.DateTime, server_default=db.func.now(), onupdate=db.func.now())
 
-    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     user = db.relationship("UserModel", back_populates="notes")
+
+    @db.validates("content")
+    def _update_preview(self, key, content):
+        self.content_preview = content[:PREVIEW_LENGTH]
+        self.content_length = len(content)
+        return content
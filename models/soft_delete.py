@@ -0,0 +1,34 @@
+from datetime import datetime
+
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.orm import with_loader_criteria
+
+from db import db
+
+
+class SoftDeleteMixin:
+    """Rows are flagged with deleted_at and removed later by the purger"""
+    deleted_at = db.Column(db.DateTime, index=True)
+
+    def soft_delete(self):
+        self.deleted_at = datetime.utcnow()
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _exclude_soft_deleted(execute_state):
+    """Hide soft-deleted rows from every ORM query, unless the query is run
+    with .execution_options(include_deleted=True)"""
+    if (
+        execute_state.is_select
+        and not execute_state.is_column_load
+        and not execute_state.is_relationship_load
+        and not execute_state.execution_options.get("include_deleted", False)
+    ):
+        execute_state.statement = execute_state.statement.options(
+            with_loader_criteria(
+                SoftDeleteMixin,
+                lambda cls: cls.deleted_at.is_(None),
+                include_aliases=True,
+            )
+        )
@@ -1,7 +1,11 @@
 from db import db
+from models.soft_delete import SoftDeleteMixin
 
-class TimetableModel(db.Model):
+class TimetableModel(SoftDeleteMixin, db.Model):
     __tablename__ = "timetables"
+    __table_args__ = (
+        db.Index("ix_timetables_user_id_day_start_time", "user_id", "day", "start_time"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     subject = db.Column(db.String(100), nullable=False)
@@ -11,5 +15,5 @@ class TimetableModel(db.Model):
     room = db.Column(db.String(50))
     teacher = db.Column(db.String(100))
 
-    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     user = db.relationship("UserModel", back_populates="timetables")
@@ -0,0 +1,40 @@
+import zlib
+
+from db import db
+
+
+class CompressedText(db.TypeDecorator):
+    """Text stored as bytes, zlib-compressed once it is longer than
+    ``threshold`` bytes. The first byte records which form was stored."""
+
+    impl = db.LargeBinary
+    cache_ok = True
+
+    PLAIN = b"\x00"
+    ZLIB = b"\x01"
+
+    def __init__(self, threshold=1024, level=6):
+        super().__init__()
+        self.threshold = threshold
+        self.level = level
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        data = value.encode("utf-8")
+        if len(data) > self.threshold:
+            return self.ZLIB + zlib.compress(data, self.level)
+        return self.PLAIN + data
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return self.to_bytes(value).decode("utf-8")
+
+    @classmethod
+    def to_bytes(cls, value):
+        """The UTF-8 text of a stored value, without decoding it"""
+        value = bytes(value)
+        if value[:1] == cls.ZLIB:
+            return zlib.decompress(value[1:])
+        return value[1:]
@@ -1,6 +1,7 @@
 from db import db
+from models.soft_delete import SoftDeleteMixin
 
-class UserModel(db.Model):
+class UserModel(SoftDeleteMixin, db.Model):
     __tablename__ = "users"
 
     id = db.Column(db.Integer, primary_key=True)
@@ -10,7 +11,7 @@ class UserModel(db.Model):
     created_at = db.Column(db.DateTime, server_default=db.func.now())
 
     # Relationships
-    timetables = db.relationship("TimetableModel", back_populates="user", lazy="dynamic", cascade="all, delete-orphan")
-    assignments = db.relationship("AssignmentModel", back_populates="user", lazy="dynamic", cascade="all, delete-orphan")
-    exams = db.relationship("ExamModel", back_populates="user", lazy="dynamic", cascade="all, delete-orphan")
-    notes = db.relationship("NoteModel", back_populates="user", lazy="dynamic", cascade="all, delete-orphan")
+    timetables = db.relationship("TimetableModel", back_populates="user", lazy="dynamic", cascade="all, delete-orphan", passive_deletes=True)
+    assignments = db.relationship("AssignmentModel", back_populates="user", lazy="dynamic", cascade="all, delete-orphan", passive_deletes=True)
+    exams = db.relationship("ExamModel", back_populates="user", lazy="dynamic", cascade="all, delete-orphan", passive_deletes=True)
+    notes = db.relationship("NoteModel", back_populates="user", lazy="dynamic", cascade="all, delete-orphan", passive_deletes=True)
@@ -0,0 +1,62 @@
+from datetime import datetime
+
+import click
+from sqlalchemy import delete, or_, select
+
+from db import db
+from jobs import on_every_database, run_periodically
+from models import (
+    UserModel, TimetableModel, AssignmentModel, ExamModel, NoteModel, IdempotencyKeyModel,
+    AssignmentArchiveModel, ExamArchiveModel,
+)
+
+CHILD_MODELS = (TimetableModel, AssignmentModel, ExamModel, NoteModel, AssignmentArchiveModel, ExamArchiveModel)
+
+
+def _drain(statement, batch_size):
+    """Run a bounded DELETE until it stops finding rows, one transaction per batch"""
+    removed = 0
+    while True:
+        result = db.session.execute(statement, execution_options={"synchronize_session": False})
+        db.session.commit()
+        removed += result.rowcount
+        if result.rowcount < batch_size:
+            return removed
+
+
+def purge_deleted(batch_size=500):
+    """Permanently remove soft-deleted rows, including everything owned by
+    soft-deleted users, and expired idempotency keys. Returns the number of
+    rows removed."""
+    deleted_users = select(UserModel.id).where(UserModel.deleted_at.is_not(None))
+    removed = 0
+
+    # Children first, in small batches, so the final user DELETE leaves
+    # (next to) nothing for ON DELETE CASCADE to do inside one transaction
+    for model in CHILD_MODELS:
+        batch = select(model.id).where(
+            or_(model.deleted_at.is_not(None), model.user_id.in_(deleted_users))
+        ).limit(batch_size)
+        removed += _drain(delete(model).where(model.id.in_(batch)), batch_size)
+
+    batch = deleted_users.limit(batch_size)
+    removed += _drain(delete(UserModel).where(UserModel.id.in_(batch)), batch_size)
+
+    batch = select(IdempotencyKeyModel.id).where(IdempotencyKeyModel.expires_at < datetime.utcnow()).limit(batch_size)
+    removed += _drain(delete(IdempotencyKeyModel).where(IdempotencyKeyModel.id.in_(batch)), batch_size)
+    return removed
+
+
+def init_purger(app):
+    """Register the purge-deleted command and the periodic purger"""
+
+    @app.cli.command("purge-deleted")
+    def purge_deleted_command():
+        """Remove soft-deleted rows now."""
+        removed = on_every_database(purge_deleted, app.config["PURGE_BATCH_SIZE"])
+        click.echo(f"Removed {removed} rows.")
+
+    run_periodically(
+        app, "soft-delete-purger", app.config["PURGE_INTERVAL"],
+        purge_deleted, app.config["PURGE_BATCH_SIZE"],
+    )
@@ -3,4 +3,9 @@ from resources.user_routes import blp as UserBlueprint
 from resources.timetable_routes import blp as TimetableBlueprint
 from resources.assignment_routes import blp as AssignmentBlueprint
 from resources.exam_routes import blp as ExamBlueprint
-from resources.note_router import blp as NotesBlueprint
\ No newline at end of file
+from resources.note_router import blp as NotesBlueprint
+from resources.event_routes import blp as EventsBlueprint
+from resources.batch_routes import blp as BatchBlueprint
+from resources.agenda_routes import blp as AgendaBlueprint
+from resources.import_routes import blp as ImportBlueprint
+from resources.profile_routes import blp as ProfileBlueprint
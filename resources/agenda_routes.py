@@ -0,0 +1,72 @@
+from datetime import datetime, timedelta
+
+from flask.views import MethodView
+from flask_smorest import Blueprint, abort
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from marshmallow import Schema, fields
+
+from agenda import get_week, parse_week, week_start
+
+blp = Blueprint("Agenda", "agenda", description="Weekly Agenda")
+
+
+# Schemas
+class AgendaArgsSchema(Schema):
+    week = fields.Str(metadata={"description": "ISO week (2026-W43) or any date in the week; defaults to this week"})
+
+
+class AgendaSlotSchema(Schema):
+    kind = fields.Str(metadata={"description": "class, assignment or exam"})
+    id = fields.Int()
+    start = fields.DateTime()
+    end = fields.DateTime(allow_none=True)
+    subject = fields.Str()
+    title = fields.Str()
+    room = fields.Str(allow_none=True)
+    status = fields.Str(allow_none=True)
+
+
+class UnplacedEntrySchema(Schema):
+    id = fields.Int()
+    subject = fields.Str()
+    day = fields.Str()
+    start_time = fields.Str()
+    end_time = fields.Str()
+
+
+class AgendaSchema(Schema):
+    week = fields.Str()
+    start = fields.Date()
+    end = fields.Date()
+    slots = fields.List(fields.Nested(AgendaSlotSchema))
+    unplaced = fields.List(
+        fields.Nested(UnplacedEntrySchema),
+        metadata={"description": "Timetable entries whose day or times couldn't be read (e.g. 'Mon-Wed', 'noon')"},
+    )
+
+
+@blp.route("/agenda")
+class Agenda(MethodView):
+    @jwt_required()
+    @blp.arguments(AgendaArgsSchema, location="query")
+    @blp.response(200, AgendaSchema)
+    def get(self, args):
+        """Get the current user's classes, assignment deadlines and exams of one week, in time order"""
+        user_id = int(get_jwt_identity())
+        if args.get("week"):
+            try:
+                start = parse_week(args["week"])
+            except ValueError as err:
+                abort(400, message=str(err))
+        else:
+            start = week_start(datetime.utcnow())
+
+        slots, unplaced = get_week(user_id, start)
+        year, number, _ = start.isocalendar()
+        return {
+            "week": f"{year}-W{number:02d}",
+            "start": start,
+            "end": start + timedelta(days=6),
+            "slots": slots,
+            "unplaced": unplaced,
+        }
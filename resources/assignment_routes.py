@@ -2,10 +2,17 @@ from flask.views import MethodView
 from flask_smorest import Blueprint, abort
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from marshmallow import Schema, fields
+from webargs.fields import DelimitedList
 from datetime import datetime
+import operator
 
 from db import db
+from events import broker
 from models.assignment import AssignmentModel
+from models.archive import AssignmentArchiveModel
+from utils.idempotency import IDEMPOTENCY_KEY_HEADER, idempotent
+from utils.query_filters import CollectionQuery
+from utils.sparse_fields import SparseFieldsSchema, select_fields
 
 blp = Blueprint("Assignments", "assignments", description="Assignment Operations")
 
@@ -31,16 +38,45 @@ class AssignmentUpdateSchema(Schema):
     priority = fields.Str()
 
 
+class AssignmentQuerySchema(SparseFieldsSchema):
+    status = DelimitedList(fields.Str())
+    priority = DelimitedList(fields.Str())
+    subject = DelimitedList(fields.Str())
+    due_after = fields.DateTime()
+    due_before = fields.DateTime()
+    include_archived = fields.Bool(load_default=False)
+    sort = fields.Str(metadata={"description": "due_date or -due_date"})
+
+
+assignment_query = CollectionQuery(
+    AssignmentModel,
+    filters=("status", "priority", "subject"),
+    ranges={"due_after": ("due_date", operator.ge), "due_before": ("due_date", operator.le)},
+    sorts=("due_date",),
+    default_sort="due_date",
+    archive=AssignmentArchiveModel,
+)
+
+
+def list_assignments(args, *criteria):
+    """Run the list query for the current user, applying ?fields= as well"""
+    user_id = int(get_jwt_identity())
+    query = assignment_query.query(user_id, args, *criteria)
+    return select_fields(query, AssignmentModel, AssignmentSchema, args.get("only")).all()
+
+
 @blp.route("/assignments")
 class AssignmentList(MethodView):
     @jwt_required()
+    @blp.arguments(AssignmentQuerySchema, location="query")
     @blp.response(200, AssignmentSchema(many=True))
-    def get(self):
-        """Get all assignments for current user"""
-        user_id = int(get_jwt_identity())
-        return AssignmentModel.query.filter_by(user_id=user_id).order_by(AssignmentModel.due_date).all()
+    def get(self, args):
+        """Get assignments for current user (filter by status, priority, subject, due_after/due_before; include_archived=true adds archived ones)"""
+        return list_assignments(args)
 
     @jwt_required()
+    @idempotent
+    @blp.doc(parameters=[IDEMPOTENCY_KEY_HEADER])
     @blp.arguments(AssignmentSchema)
     @blp.response(201, AssignmentSchema)
     def post(self, assignment_data):
@@ -53,7 +89,8 @@ class AssignmentList(MethodView):
         )
         
         db.session.add(assignment)
-        db.session.commit()
+        db.session.flush()  # committed by @idempotent
+        broker.publish_on_commit(user_id, "assignments", "created", assignment.id)
         
         return assignment
 
@@ -88,6 +125,7 @@ class Assignment(MethodView):
                 setattr(assignment, key, value)
         
         db.session.commit()
+        broker.publish(user_id, "assignments", "updated", assignment.id)
         return assignment
 
     @jwt_required()
@@ -99,8 +137,9 @@ class Assignment(MethodView):
         if not assignment:
             abort(404, message="Assignment not found.")
         
-        db.session.delete(assignment)
+        assignment.soft_delete()
         db.session.commit()
+        broker.publish(user_id, "assignments", "deleted", assignment.id)
         
         return {"message": "Assignment deleted."}, 200
 
@@ -108,11 +147,11 @@ class Assignment(MethodView):
 @blp.route("/assignments/status/<string:status>")
 class AssignmentsByStatus(MethodView):
     @jwt_required()
+    @blp.arguments(AssignmentQuerySchema, location="query")
     @blp.response(200, AssignmentSchema(many=True))
-    def get(self, status):
+    def get(self, args, status):
         """Get assignments by status (pending/completed)"""
-        user_id = int(get_jwt_identity())
-        return AssignmentModel.query.filter_by(user_id=user_id, status=status).all()
+        return list_assignments({**args, "status": [status]})
 
 
 @blp.route("/assignments/<int:assignment_id>/complete")
@@ -129,6 +168,7 @@ class MarkAssignmentComplete(MethodView):
         
         assignment.status = "completed"
         db.session.commit()
+        broker.publish(user_id, "assignments", "updated", assignment.id)
         
         return assignment
 
@@ -136,33 +176,31 @@ class MarkAssignmentComplete(MethodView):
 @blp.route("/assignments/upcoming")
 class UpcomingAssignments(MethodView):
     @jwt_required()
+    @blp.arguments(AssignmentQuerySchema, location="query")
     @blp.response(200, AssignmentSchema(many=True))
-    def get(self):
+    def get(self, args):
         """Get upcoming assignment deadlines (next 7 days, pending only)"""
         from datetime import timedelta
-        user_id = int(get_jwt_identity())
         now = datetime.utcnow()
         next_week = now + timedelta(days=7)
         
-        return AssignmentModel.query.filter(
-            AssignmentModel.user_id == user_id,
-            AssignmentModel.due_date >= now,
-            AssignmentModel.due_date <= next_week,
+        return list_assignments(
+            {**args, "due_after": now, "due_before": next_week},
             AssignmentModel.status != "completed"
-        ).order_by(AssignmentModel.due_date).all()
+        )
 
 
 @blp.route("/assignments/overdue")
 class OverdueAssignments(MethodView):
     @jwt_required()
+    @blp.arguments(AssignmentQuerySchema, location="query")
     @blp.response(200, AssignmentSchema(many=True))
-    def get(self):
+    def get(self, args):
         """Get overdue assignments (past due date, not completed)"""
-        user_id = int(get_jwt_identity())
         now = datetime.utcnow()
         
-        return AssignmentModel.query.filter(
-            AssignmentModel.user_id == user_id,
+        return list_assignments(
+            args,
             AssignmentModel.due_date < now,
             AssignmentModel.status != "completed"
-        ).order_by(AssignmentModel.due_date).all()
+        )
@@ -0,0 +1,96 @@
+from flask import current_app
+from flask.views import MethodView
+from flask_smorest import Blueprint, abort
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from marshmallow import Schema, ValidationError, fields, validate
+
+from resources.assignment_routes import AssignmentQuerySchema, AssignmentSchema, assignment_query
+from resources.exam_routes import ExamQuerySchema, ExamSchema, exam_query
+from resources.note_router import NoteListSchema, NoteQuerySchema, note_query
+from resources.timetable_routes import TimetableQuerySchema, TimetableSchema, timetable_query
+from utils.batch_loader import BatchLoader
+from utils.sparse_fields import field_names
+
+blp = Blueprint("Batch", "batch", description="Batch Queries")
+
+# collection -> (CollectionQuery, query string schema, response schema, default fields)
+COLLECTIONS = {
+    "assignments": (
+        assignment_query, AssignmentQuerySchema, AssignmentSchema,
+        ["title", "subject", "description", "due_date", "status", "priority", "created_at"],
+    ),
+    "exams": (
+        exam_query, ExamQuerySchema, ExamSchema,
+        ["subject", "exam_type", "exam_date", "room", "notes", "created_at"],
+    ),
+    "timetable": (
+        timetable_query, TimetableQuerySchema, TimetableSchema,
+        ["subject", "day", "start_time", "end_time", "room", "teacher"],
+    ),
+    "notes": (
+        note_query, NoteQuerySchema, NoteListSchema,
+        ["title", "content_preview", "content_length", "created_at", "updated_at"],
+    ),
+}
+
+
+# Schemas
+class SliceSchema(Schema):
+    collection = fields.Str(required=True, validate=validate.OneOf(list(COLLECTIONS)))
+    params = fields.Dict(
+        keys=fields.Str(),
+        values=fields.Str(),
+        load_default=dict,
+        metadata={"description": "Same arguments as the collection's list endpoint query string"},
+    )
+    limit = fields.Int(load_default=50, validate=validate.Range(min=1))
+
+
+class BatchQuerySchema(Schema):
+    queries = fields.Dict(keys=fields.Str(), values=fields.Nested(SliceSchema), required=True)
+
+
+class BatchResultSchema(Schema):
+    results = fields.Dict(keys=fields.Str(), values=fields.List(fields.Dict()))
+
+
+@blp.route("/query")
+class BatchQuery(MethodView):
+    @jwt_required()
+    @blp.arguments(BatchQuerySchema)
+    @blp.response(200, BatchResultSchema)
+    def post(self, data):
+        """Fetch several filtered slices of the current user's collections in one request.
+
+        Each slice names a collection, the query string arguments of its list
+        endpoint (filters, ranges, sort, fields) and a row limit. Slices of
+        the same collection are loaded with a single SQL query.
+        """
+        queries = data["queries"]
+        config = current_app.config
+        if len(queries) > config["BATCH_MAX_QUERIES"]:
+            abort(400, message=f"At most {config['BATCH_MAX_QUERIES']} queries per request.")
+        too_large = [name for name, spec in queries.items() if spec["limit"] > config["BATCH_MAX_LIMIT"]]
+        if too_large:
+            abort(400, message=f"Limit of {', '.join(too_large)} exceeds {config['BATCH_MAX_LIMIT']}.")
+        if sum(spec["limit"] for spec in queries.values()) > config["BATCH_MAX_ROWS"]:
+            abort(400, message=f"Limits add up to more than {config['BATCH_MAX_ROWS']} rows.")
+
+        loader = BatchLoader(int(get_jwt_identity()))
+        schemas = {}
+        errors = {}
+        for name, spec in queries.items():
+            collection_query, query_schema, schema, default_fields = COLLECTIONS[spec["collection"]]
+            try:
+                args = query_schema().load(spec["params"])
+            except ValidationError as err:
+                errors[name] = err.messages
+                continue
+            only = field_names(collection_query.model, schema, args.get("only") or default_fields)
+            loader.add(name, collection_query, args, only, spec["limit"])
+            schemas[name] = schema(many=True, only=only)
+        if errors:
+            abort(422, errors={"json": {"queries": errors}})
+
+        rows = loader.load()
+        return {"results": {name: schemas[name].dump(rows[name]) for name in queries}}
@@ -0,0 +1,83 @@
+import json
+import time
+
+from flask import Response, current_app, request
+from flask.views import MethodView
+from flask_smorest import Blueprint
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from marshmallow import Schema, fields, validate
+
+from db import db
+from events import broker
+
+blp = Blueprint("Events", "events", description="Change Notifications")
+
+
+# Schemas
+class EventSchema(Schema):
+    id = fields.Int()
+    collection = fields.Str()
+    action = fields.Str()
+    item_id = fields.Int()
+
+
+class PollArgsSchema(Schema):
+    since = fields.Int(load_default=0)
+    timeout = fields.Int(load_default=25, validate=validate.Range(min=0, max=60))
+
+
+class PollResultSchema(Schema):
+    events = fields.List(fields.Nested(EventSchema))
+    last_id = fields.Int()
+    reset = fields.Bool()
+
+
+@blp.route("/events")
+class EventStream(MethodView):
+    @jwt_required()
+    def get(self):
+        """Stream change events for current user (Server-Sent Events)"""
+        user_id = int(get_jwt_identity())
+        try:
+            last_id = int(request.headers["Last-Event-ID"])
+        except (KeyError, ValueError):
+            last_id = broker.last_id(user_id)
+        heartbeat = current_app.config["EVENTS_HEARTBEAT"]
+        closes_at = time.monotonic() + current_app.config["EVENTS_STREAM_TIMEOUT"]
+
+        def stream():
+            nonlocal last_id
+            yield f"retry: {heartbeat * 1000}\n\n"
+            while time.monotonic() < closes_at:
+                events = broker.wait(user_id, last_id, heartbeat)
+                if events is None:
+                    # Missed events: the client should refetch everything
+                    last_id = broker.last_id(user_id)
+                    yield f"id: {last_id}\nevent: reset\ndata: {{}}\n\n"
+                    continue
+                for event in events:
+                    last_id = event["id"]
+                    yield f"id: {last_id}\nevent: change\ndata: {json.dumps(EventSchema().dump(event))}\n\n"
+                if not events:
+                    yield ": keep-alive\n\n"
+
+        return Response(stream(), mimetype="text/event-stream", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
+@blp.route("/events/poll")
+class EventPoll(MethodView):
+    @jwt_required()
+    @blp.arguments(PollArgsSchema, location="query")
+    @blp.response(200, PollResultSchema)
+    def get(self, args):
+        """Wait for change events newer than `since` (long-poll)"""
+        user_id = int(get_jwt_identity())
+        db.session.close()  # don't hold a pooled connection while waiting
+        events = broker.wait(user_id, args["since"], args["timeout"])
+        if events is None:
+            return {"events": [], "last_id": broker.last_id(user_id), "reset": True}
+        return {
+            "events": events,
+            "last_id": events[-1]["id"] if events else max(args["since"], broker.last_id(user_id)),
+            "reset": False,
+        }
@@ -2,9 +2,16 @@ from flask.views import MethodView
 from flask_smorest import Blueprint, abort
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from marshmallow import Schema, fields
+from webargs.fields import DelimitedList
+import operator
 
 from db import db
+from events import broker
 from models.exam import ExamModel
+from models.archive import ExamArchiveModel
+from utils.idempotency import IDEMPOTENCY_KEY_HEADER, idempotent
+from utils.query_filters import CollectionQuery
+from utils.sparse_fields import SparseFieldsSchema, select_fields
 
 blp = Blueprint("Exams", "exams", description="Exam Operations")
 
@@ -28,16 +35,44 @@ class ExamUpdateSchema(Schema):
     notes = fields.Str()
 
 
+class ExamQuerySchema(SparseFieldsSchema):
+    exam_type = DelimitedList(fields.Str())
+    subject = DelimitedList(fields.Str())
+    date_from = fields.DateTime(data_key="from")
+    date_to = fields.DateTime(data_key="to")
+    include_archived = fields.Bool(load_default=False)
+    sort = fields.Str(metadata={"description": "exam_date or -exam_date"})
+
+
+exam_query = CollectionQuery(
+    ExamModel,
+    filters=("exam_type", "subject"),
+    ranges={"date_from": ("exam_date", operator.ge), "date_to": ("exam_date", operator.le)},
+    sorts=("exam_date",),
+    default_sort="exam_date",
+    archive=ExamArchiveModel,
+)
+
+
+def list_exams(args, *criteria):
+    """Run the list query for the current user, applying ?fields= as well"""
+    user_id = int(get_jwt_identity())
+    query = exam_query.query(user_id, args, *criteria)
+    return select_fields(query, ExamModel, ExamSchema, args.get("only")).all()
+
+
 @blp.route("/exams")
 class ExamList(MethodView):
     @jwt_required()
+    @blp.arguments(ExamQuerySchema, location="query")
     @blp.response(200, ExamSchema(many=True))
-    def get(self):
-        """Get all exams for current user"""
-        user_id = int(get_jwt_identity())
-        return ExamModel.query.filter_by(user_id=user_id).order_by(ExamModel.exam_date).all()
+    def get(self, args):
+        """Get exams for current user (filter by exam_type, subject, from/to; include_archived=true adds archived ones)"""
+        return list_exams(args)
 
     @jwt_required()
+    @idempotent
+    @blp.doc(parameters=[IDEMPOTENCY_KEY_HEADER])
     @blp.arguments(ExamSchema)
     @blp.response(201, ExamSchema)
     def post(self, exam_data):
@@ -50,7 +85,8 @@ class ExamList(MethodView):
         )
         
         db.session.add(exam)
-        db.session.commit()
+        db.session.flush()  # committed by @idempotent
+        broker.publish_on_commit(user_id, "exams", "created", exam.id)
         
         return exam
 
@@ -85,6 +121,7 @@ class Exam(MethodView):
                 setattr(exam, key, value)
         
         db.session.commit()
+        broker.publish(user_id, "exams", "updated", exam.id)
         return exam
 
     @jwt_required()
@@ -96,8 +133,9 @@ class Exam(MethodView):
         if not exam:
             abort(404, message="Exam not found.")
         
-        db.session.delete(exam)
+        exam.soft_delete()
         db.session.commit()
+        broker.publish(user_id, "exams", "deleted", exam.id)
         
         return {"message": "Exam deleted."}, 200
 
@@ -105,26 +143,22 @@ class Exam(MethodView):
 @blp.route("/exams/type/<string:exam_type>")
 class ExamsByType(MethodView):
     @jwt_required()
+    @blp.arguments(ExamQuerySchema, location="query")
     @blp.response(200, ExamSchema(many=True))
-    def get(self, exam_type):
+    def get(self, args, exam_type):
         """Get exams by type (midterm/final/quiz)"""
-        user_id = int(get_jwt_identity())
-        return ExamModel.query.filter_by(user_id=user_id, exam_type=exam_type).all()
+        return list_exams({**args, "exam_type": [exam_type]})
 
 
 @blp.route("/exams/upcoming")
 class UpcomingExams(MethodView):
     @jwt_required()
+    @blp.arguments(ExamQuerySchema, location="query")
     @blp.response(200, ExamSchema(many=True))
-    def get(self):
+    def get(self, args):
         """Get upcoming exams (next 7 days)"""
         from datetime import datetime, timedelta
-        user_id = int(get_jwt_identity())
         now = datetime.utcnow()
         next_week = now + timedelta(days=7)
         
-        return ExamModel.query.filter(
-            ExamModel.user_id == user_id,
-            ExamModel.exam_date >= now,
-            ExamModel.exam_date <= next_week
-        ).order_by(ExamModel.exam_date).all()
+        return list_exams({**args, "date_from": now, "date_to": next_week})
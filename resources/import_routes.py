@@ -0,0 +1,52 @@
+import json
+
+from flask import Response, current_app, request, stream_with_context
+from flask.views import MethodView
+from flask_smorest import Blueprint
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from marshmallow import Schema, fields, validate
+
+from events import broker
+import importer  # a module, as importer imports the resource schemas in turn
+
+blp = Blueprint("Import", "import", description="Bulk Import")
+
+
+# Schemas
+class ImportArgsSchema(Schema):
+    format = fields.Str(
+        validate=validate.OneOf(["csv", "ics"]),
+        metadata={"description": "Defaults to ics for text/calendar bodies, else csv"},
+    )
+
+
+@blp.route("/import/<any(timetable, exams):kind>")
+class Import(MethodView):
+    @jwt_required()
+    @blp.arguments(ImportArgsSchema, location="query")
+    def post(self, args, kind):
+        """Import timetable entries or exams for current user from a CSV or ICS request body.
+
+        The body is read as a stream and imported in chunks; the response is
+        newline-delimited JSON with one progress report (rows processed and
+        imported, and the invalid rows with their line numbers) per chunk.
+        """
+        user_id = int(get_jwt_identity())
+        fmt = args.get("format") or ("ics" if request.mimetype == "text/calendar" else "csv")
+        reports = importer.import_rows(
+            kind,
+            importer.parse(kind, importer.open_text(request.stream), fmt),
+            user_id,
+            current_app.config["IMPORT_CHUNK_SIZE"],
+            current_app.config["IMPORT_MAX_ERRORS"],
+        )
+
+        def generate():
+            imported = 0
+            for report in reports:
+                imported = report["imported"]
+                yield json.dumps(report) + "\n"
+            if imported:
+                broker.publish(user_id, kind, "imported", None)
+
+        return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
@@ -1,10 +1,17 @@
+from flask import Response, request
 from flask.views import MethodView
 from flask_smorest import Blueprint, abort
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from marshmallow import Schema, fields
+import operator
 
 from db import db
+from events import broker
 from models.notes import NoteModel
+from models.types import CompressedText
+from utils.idempotency import IDEMPOTENCY_KEY_HEADER, idempotent
+from utils.query_filters import CollectionQuery
+from utils.sparse_fields import SparseFieldsSchema, select_fields
 
 blp = Blueprint("Notes", "notes", description="Notes Operations")
 # Schemas
@@ -15,20 +22,48 @@ class NoteSchema(Schema):
     created_at = fields.DateTime(dump_only=True)
     updated_at = fields.DateTime(dump_only=True)
 
+class NoteListSchema(NoteSchema):
+    content_preview = fields.Str(dump_only=True)
+    content_length = fields.Int(dump_only=True)
+
 class NoteUpdateSchema(Schema):
     title = fields.Str()
     content = fields.Str()
 
+class NoteQuerySchema(SparseFieldsSchema):
+    preview = fields.Bool(load_default=False)
+    date_from = fields.DateTime(data_key="from")
+    date_to = fields.DateTime(data_key="to")
+    sort = fields.Str(metadata={"description": "created_at or -created_at"})
+
+note_query = CollectionQuery(
+    NoteModel,
+    ranges={"date_from": ("created_at", operator.ge), "date_to": ("created_at", operator.le)},
+    sorts=("created_at",),
+    default_sort="-created_at",
+)
+
 @blp.route("/notes")
 class NoteList(MethodView):
     @jwt_required()
-    @blp.response(200, NoteSchema(many=True))
-    def get(self):
-        """Get all notes for current user"""
+    @blp.arguments(NoteQuerySchema, location="query")
+    @blp.response(200, NoteListSchema(many=True))
+    def get(self, args):
+        """Get notes for current user (filter by from/to; ?preview=true returns the stored content_preview instead of content)"""
         user_id = int(get_jwt_identity())
-        return NoteModel.query.filter_by(user_id=user_id).order_by(NoteModel.created_at.desc()).all()
+        query = note_query.query(user_id, args)
+
+        if args["preview"]:
+            only = [name for name in args.get("only") or ["title", "created_at", "updated_at"] if name != "content"]
+            only += ["content_preview", "content_length"]
+        else:
+            # Select content explicitly: it is deferred on the model
+            only = args.get("only") or ["title", "content", "created_at", "updated_at"]
+        return select_fields(query, NoteModel, NoteListSchema, only).all()
 
     @jwt_required()
+    @idempotent
+    @blp.doc(parameters=[IDEMPOTENCY_KEY_HEADER])
     @blp.arguments(NoteSchema)
     @blp.response(201, NoteSchema)
     def post(self, note_data):
@@ -41,7 +76,8 @@ class NoteList(MethodView):
         )
         
         db.session.add(note)
-        db.session.commit()
+        db.session.flush()  # committed by @idempotent
+        broker.publish_on_commit(user_id, "notes", "created", note.id)
         
         return note
 
@@ -52,7 +88,7 @@ class Note(MethodView):
     def get(self, note_id):
         """Get a specific note by ID"""
         user_id = int(get_jwt_identity())
-        note = NoteModel.query.filter_by(id=note_id, user_id=user_id).first()
+        note = NoteModel.query.options(db.undefer(NoteModel.content)).filter_by(id=note_id, user_id=user_id).first()
         if not note:
             abort(404, message="Note not found")
         return note
@@ -62,7 +98,7 @@ class Note(MethodView):
     def put(self, note_data, note_id):
         """Update a specific note by ID"""
         user_id = int(get_jwt_identity())
-        note = NoteModel.query.filter_by(id=note_id, user_id=user_id).first()
+        note = NoteModel.query.options(db.undefer(NoteModel.content)).filter_by(id=note_id, user_id=user_id).first()
         if not note:
             abort(404, message="Note not found")
         
@@ -72,6 +108,7 @@ class Note(MethodView):
             note.content = note_data["content"]
         
         db.session.commit()
+        broker.publish(user_id, "notes", "updated", note.id)
         return note
     @jwt_required()
     @blp.response(204)
@@ -82,9 +119,33 @@ class Note(MethodView):
         if not note:
             abort(404, message="Note not found")
         
-        db.session.delete(note)
+        note.soft_delete()
         db.session.commit()
+        broker.publish(user_id, "notes", "deleted", note.id)
         return {"message": "Note deleted."}, 200
+
+@blp.route("/notes/<int:note_id>/content")
+class NoteContent(MethodView):
+    @jwt_required()
+    @blp.doc(parameters=[{"in": "header", "name": "Range", "schema": {"type": "string"}, "description": "e.g. bytes=0-65535"}])
+    def get(self, note_id):
+        """Get the full content of a note as text/plain (supports Range
+        requests, answered as application/octet-stream)"""
+        user_id = int(get_jwt_identity())
+        # The stored bytes, so the text isn't decoded only to be encoded again
+        stored = NoteModel.query.with_entities(db.type_coerce(NoteModel.content, db.LargeBinary)).filter_by(
+            id=note_id, user_id=user_id
+        ).scalar()
+        if stored is None:
+            abort(404, message="Note not found")
+
+        data = CompressedText.to_bytes(stored)
+        response = Response(data, mimetype="text/plain")
+        response = response.make_conditional(request, accept_ranges=True, complete_length=len(data))
+        if response.status_code == 206:
+            # A byte range can end inside a multi-byte character, so it isn't text
+            response.mimetype = "application/octet-stream"
+        return response
         
     
     
\ No newline at end of file
@@ -0,0 +1,42 @@
+from flask import Response, current_app
+from flask.views import MethodView
+from flask_smorest import Blueprint, abort
+from flask_jwt_extended import jwt_required
+from marshmallow import Schema, fields, validate
+
+from utils.admin import require_admin
+
+blp = Blueprint("Profiling", "profiling", description="Request Profiling (admins only)")
+
+
+# Schemas
+class ProfileArgsSchema(Schema):
+    endpoint = fields.Str(metadata={"description": "Only this endpoint, e.g. Assignments.AssignmentList:GET"})
+    format = fields.Str(load_default="summary", validate=validate.OneOf(["summary", "collapsed"]))
+
+
+def _profiler():
+    """This worker's profiler, for admins only"""
+    require_admin()
+    profiler = current_app.extensions.get("profiler")
+    if profiler is None:
+        abort(404, message="Profiling is not enabled.")
+    return profiler
+
+
+@blp.route("/admin/profile")
+class Profile(MethodView):
+    @jwt_required()
+    @blp.arguments(ProfileArgsSchema, location="query")
+    def get(self, args):
+        """Get profiled requests per endpoint, or their stacks (?format=collapsed) for a flamegraph"""
+        profiler = _profiler()
+        if args["format"] == "collapsed":
+            return Response(profiler.collapsed(args.get("endpoint")), mimetype="text/plain")
+        return {"endpoints": profiler.summary()}, 200
+
+    @jwt_required()
+    def delete(self):
+        """Clear the collected profiles"""
+        _profiler().reset()
+        return {"message": "Profiles cleared."}, 200
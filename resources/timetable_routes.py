@@ -2,9 +2,14 @@ from flask.views import MethodView
 from flask_smorest import Blueprint, abort
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from marshmallow import Schema, fields
+from webargs.fields import DelimitedList
 
 from db import db
+from events import broker
 from models.timetable import TimetableModel
+from utils.idempotency import IDEMPOTENCY_KEY_HEADER, idempotent
+from utils.query_filters import CollectionQuery
+from utils.sparse_fields import SparseFieldsSchema, select_fields
 
 blp = Blueprint("Timetable", "timetable", description="Timetable Operations")
 
@@ -29,16 +34,38 @@ class TimetableUpdateSchema(Schema):
     teacher = fields.Str()
 
 
+class TimetableQuerySchema(SparseFieldsSchema):
+    day = DelimitedList(fields.Str())
+    subject = DelimitedList(fields.Str())
+    sort = fields.Str(metadata={"description": "start_time or -start_time (requires a single day)"})
+
+
+timetable_query = CollectionQuery(
+    TimetableModel,
+    filters=("day", "subject"),
+    sorts=("start_time",),
+)
+
+
+def list_timetable(args, *criteria):
+    """Run the list query for the current user, applying ?fields= as well"""
+    user_id = int(get_jwt_identity())
+    query = timetable_query.query(user_id, args, *criteria)
+    return select_fields(query, TimetableModel, TimetableSchema, args.get("only")).all()
+
+
 @blp.route("/timetable")
 class TimetableList(MethodView):
     @jwt_required()
+    @blp.arguments(TimetableQuerySchema, location="query")
     @blp.response(200, TimetableSchema(many=True))
-    def get(self):
-        """Get all timetable entries for current user"""
-        user_id = int(get_jwt_identity())
-        return TimetableModel.query.filter_by(user_id=user_id).all()
+    def get(self, args):
+        """Get timetable entries for current user (filter by day, subject)"""
+        return list_timetable(args)
 
     @jwt_required()
+    @idempotent
+    @blp.doc(parameters=[IDEMPOTENCY_KEY_HEADER])
     @blp.arguments(TimetableSchema)
     @blp.response(201, TimetableSchema)
     def post(self, timetable_data):
@@ -51,7 +78,8 @@ class TimetableList(MethodView):
         )
         
         db.session.add(timetable)
-        db.session.commit()
+        db.session.flush()  # committed by @idempotent
+        broker.publish_on_commit(user_id, "timetable", "created", timetable.id)
         
         return timetable
 
@@ -86,6 +114,7 @@ class Timetable(MethodView):
                 setattr(timetable, key, value)
         
         db.session.commit()
+        broker.publish(user_id, "timetable", "updated", timetable.id)
         return timetable
 
     @jwt_required()
@@ -97,8 +126,9 @@ class Timetable(MethodView):
         if not timetable:
             abort(404, message="Timetable entry not found.")
         
-        db.session.delete(timetable)
+        timetable.soft_delete()
         db.session.commit()
+        broker.publish(user_id, "timetable", "deleted", timetable.id)
         
         return {"message": "Timetable entry deleted."}, 200
 
@@ -106,8 +136,8 @@ class Timetable(MethodView):
 @blp.route("/timetable/day/<string:day>")
 class TimetableByDay(MethodView):
     @jwt_required()
+    @blp.arguments(TimetableQuerySchema, location="query")
     @blp.response(200, TimetableSchema(many=True))
-    def get(self, day):
+    def get(self, args, day):
         """Get timetable entries for a specific day"""
-        user_id = int(get_jwt_identity())
-        return TimetableModel.query.filter_by(user_id=user_id, day=day).all()
+        return list_timetable({**args, "day": [day]})
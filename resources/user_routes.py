@@ -5,7 +5,10 @@ from passlib.hash import pbkdf2_sha256
 from marshmallow import Schema, fields
 
 from db import db
+from cache import user_cache
 from models.user import UserModel
+from sharding import shards
+from utils.admin import require_admin
 
 blp = Blueprint("Users", "users", description="User Authentication Operations")
 
@@ -34,10 +37,13 @@ class UserRegister(MethodView):
     @blp.arguments(UserRegisterSchema)
     def post(self, user_data):
         """Register a new user"""
-        if UserModel.query.filter(UserModel.email == user_data["email"]).first():
+        # Accounts awaiting purge still hold their email and username
+        users = UserModel.query.execution_options(include_deleted=True)
+
+        if users.filter(UserModel.email == user_data["email"]).first():
             abort(409, message="A user with that email already exists.")
 
-        if UserModel.query.filter(UserModel.username == user_data["username"]).first():
+        if users.filter(UserModel.username == user_data["username"]).first():
             abort(409, message="A user with that username already exists.")
 
         user = UserModel(
@@ -47,6 +53,9 @@ class UserRegister(MethodView):
         )
 
         db.session.add(user)
+        db.session.flush()
+        # Allocates the user to a shard by its new id (no-op without sharding)
+        shards.sync_user(user)
         db.session.commit()
 
         return {"message": "User registered successfully."}, 201
@@ -92,9 +101,30 @@ class UserProfile(MethodView):
     def get(self):
         """Get current user profile"""
         current_user_id = get_jwt_identity()
-        user = UserModel.query.get_or_404(int(current_user_id))
+        user = user_cache.get(int(current_user_id))
+        if user is None:
+            abort(404, message="User not found.")
         return user
 
+    @jwt_required()
+    def delete(self):
+        """Delete the current user's account (data is purged in the background)"""
+        user = UserModel.query.get_or_404(int(get_jwt_identity()))
+        user.soft_delete()
+        db.session.flush()
+        shards.sync_user(user)
+        db.session.commit()
+        return {"message": "Account deleted."}, 202
+
+@blp.route("/cache/stats")
+class CacheStats(MethodView):
+    @jwt_required()
+    def get(self):
+        """Get user cache hit rates for this worker (admins only)"""
+        require_admin()
+        return user_cache.stats(), 200
+
+
 @blp.route("/all")
 class AllUsers(MethodView):
     @jwt_required()
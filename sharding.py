@@ -0,0 +1,274 @@
+import bisect
+import hashlib
+from contextlib import contextmanager
+
+import click
+from flask import g
+from flask_jwt_extended import get_jwt_identity
+from sqlalchemy import delete, insert, inspect, select, update
+from sqlalchemy.sql.util import find_tables
+
+from db import db
+from models import (
+    AgendaWeekModel, IdempotencyKeyModel, UserModel,
+    AssignmentModel, ExamModel, AssignmentArchiveModel, ExamArchiveModel,
+)
+
+# Per-user tables that hold ids of other rows (agenda slots, stored
+# responses): the ids change when a user moves, so their rows are dropped
+# instead of copied. Agenda weeks are rebuilt on read; replays just stop.
+NOT_COPIED = (AgendaWeekModel.__table__, IdempotencyKeyModel.__table__)
+
+# Archive table -> hot table it shares ids with. Moved archive rows take
+# their new ids from the hot table, so later inserts there can't reuse them.
+ARCHIVED_FROM = {
+    AssignmentArchiveModel.__table__: AssignmentModel.__table__,
+    ExamArchiveModel.__table__: ExamModel.__table__,
+}
+
+
+class HashRing:
+    """Consistent hash of user ids onto shard names.
+
+    Each shard owns ``replicas`` points on the ring, so adding a shard only
+    moves about 1/N of the users to it.
+    """
+
+    def __init__(self, names, replicas=64):
+        points = sorted(
+            (_hash(f"{name}#{replica}"), name) for name in names for replica in range(replicas)
+        )
+        self._hashes = [point for point, _ in points]
+        self._names = [name for _, name in points]
+
+    def shard_for(self, user_id):
+        index = bisect.bisect(self._hashes, _hash(str(user_id))) % len(self._hashes)
+        return self._names[index]
+
+
+def _hash(value):
+    return int.from_bytes(hashlib.md5(value.encode()).digest()[:8], "big")
+
+
+class ShardRouter:
+    """Optional horizontal partitioning of user data by user_id.
+
+    With SHARD_URLS set, every table with a ``user_id`` column lives on one
+    of the shard databases (SQLite files, or Postgres schemas selected with
+    ``?options=-csearch_path%3D<schema>``), picked by a consistent hash of
+    the JWT identity. The default database stays the directory: it holds
+    the users table that login, registration and the JWT checks read, and
+    each shard keeps a copy of its users' rows for its foreign keys.
+
+    Shards are the SQLAlchemy binds shard0..shardN-1, in SHARD_URLS order;
+    only append to that list, then run ``flask shards rebalance``.
+    """
+
+    def __init__(self, app=None):
+        self.keys = []
+        self.ring = None
+        self._sharded = {}  # table -> has a user_id column
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Call before db.init_app(), which creates the shard engines"""
+        self._register_commands(app)
+
+        # The router is a module-level singleton: forget the previous app's shards
+        self.keys = []
+        self.ring = None
+        urls = app.config["SHARD_URLS"]
+        if not urls:
+            return
+        self.keys = [f"shard{index}" for index in range(len(urls))]
+        self.ring = HashRing(self.keys, app.config["SHARD_REPLICAS"])
+        app.config["SQLALCHEMY_BINDS"] = {
+            **(app.config.get("SQLALCHEMY_BINDS") or {}),
+            **dict(zip(self.keys, urls)),
+        }
+        app.extensions["sharding"] = self
+
+    @property
+    def enabled(self):
+        return bool(self.keys)
+
+    def shard_for(self, user_id):
+        return self.ring.shard_for(int(user_id))
+
+    def current(self):
+        """Shard of the current use_shard() block, else of the JWT identity"""
+        if "_shard" in g:
+            return g._shard
+        try:
+            identity = get_jwt_identity()
+        except RuntimeError:  # not in a request that verified a JWT
+            return None
+        return self.shard_for(identity) if identity is not None else None
+
+    @contextmanager
+    def use_shard(self, key):
+        """Send every statement of the block, users included, to one shard
+        (None for the directory); for maintenance work outside requests"""
+        previous = g.get("_shard", _UNSET)
+        g._shard = key
+        try:
+            yield
+        finally:
+            if previous is _UNSET:
+                g.pop("_shard", None)
+            else:
+                g._shard = previous
+
+    def get_bind(self, mapper, clause):
+        """Engine for a statement, or None to use the default one"""
+        explicit = "_shard" in g
+        key = self.current()
+        if key is None:
+            return None
+        if explicit or self._is_sharded(mapper, clause):
+            return db.engines[key]
+        return None
+
+    def _is_sharded(self, mapper, clause):
+        if mapper is not None:
+            tables = [inspect(mapper).local_table]
+        elif clause is not None:
+            tables = find_tables(clause, include_crud=True)
+        else:
+            return False
+        for table in tables:
+            if table not in self._sharded:
+                self._sharded[table] = "user_id" in getattr(table, "c", ())
+            if self._sharded[table]:
+                return True
+        return False
+
+    def sync_user(self, user):
+        """Copy a directory user row to its shard, in the session's transaction.
+        Call after flushing a new or changed UserModel."""
+        if not self.enabled:
+            return
+        table = UserModel.__table__
+        values = {column.name: getattr(user, column.key) for column in table.columns}
+        connection = db.session.connection(bind_arguments={"bind": db.engines[self.shard_for(user.id)]})
+        if not connection.execute(update(table).where(table.c.id == user.id).values(values)).rowcount:
+            connection.execute(insert(table).values(values))
+
+    def rebalance(self, batch_size=1000, dry_run=False, echo=None):
+        """Move every user's rows to the shard the ring assigns them to, and
+        mirror directory users that are on no shard yet. Returns the number
+        of users moved. Run it with the application stopped.
+
+        Moved rows get new ids on their new shard (ids are only unique per
+        shard), so clients should reload the moved users' collections. Their
+        materialized agenda weeks and idempotency keys are dropped."""
+        users = UserModel.__table__
+        tables = [table for table in db.metadata.sorted_tables if "user_id" in table.c]
+        mirrored = {}
+        for key in self.keys:
+            with db.engines[key].connect() as connection:
+                mirrored[key] = set(connection.execute(select(users.c.id)).scalars())
+
+        moved = set()
+        for source in [None, *self.keys]:
+            with db.engines[source].connect() as connection:
+                owners = set()
+                for table in tables:
+                    owners.update(connection.execute(select(table.c.user_id).distinct()).scalars())
+                if source is None:
+                    # The directory keeps its users; it only hands out their
+                    # data and mirrors the users on no shard yet. Users on
+                    # another shard than their own are moved by that
+                    # shard's pass instead.
+                    directory = set(connection.execute(select(users.c.id)).scalars())
+                    owners |= directory - set().union(*mirrored.values())
+                    owners = {
+                        user_id for user_id in owners
+                        if not any(user_id in ids for key, ids in mirrored.items() if key != self.shard_for(user_id))
+                    }
+                else:
+                    owners |= mirrored[source]
+
+            for user_id in sorted(owners):
+                target = self.shard_for(user_id)
+                if target == source:
+                    continue
+                if echo:
+                    echo(f"user {user_id}: {source or 'directory'} -> {target}")
+                if not dry_run:
+                    self._move_user(user_id, source, target, tables, batch_size)
+                moved.add(user_id)
+        return len(moved)
+
+    def _move_user(self, user_id, source, target, tables, batch_size):
+        users = UserModel.__table__
+        with db.engines[source].connect() as reader, db.engines[target].begin() as writer:
+            # Start from a clean slate so an interrupted move can be rerun
+            for table in reversed(tables):
+                writer.execute(delete(table).where(table.c.user_id == user_id))
+            user = reader.execute(select(users).where(users.c.id == user_id)).mappings().first()
+            if user is not None:
+                writer.execute(delete(users).where(users.c.id == user_id))
+                writer.execute(insert(users), [dict(user)])
+            for table in tables:
+                if table in NOT_COPIED:
+                    continue
+                result = reader.execution_options(yield_per=batch_size).execute(
+                    select(table).where(table.c.user_id == user_id)
+                )
+                for rows in result.mappings().partitions():
+                    # Ids are per shard, so moved rows are numbered anew
+                    rows = [{k: v for k, v in row.items() if k != "id"} for row in rows]
+                    if table in ARCHIVED_FROM:
+                        self._number_archived(writer, ARCHIVED_FROM[table], rows)
+                    writer.execute(insert(table), rows)
+
+        with db.engines[source].begin() as connection:
+            for table in reversed(tables):
+                connection.execute(delete(table).where(table.c.user_id == user_id))
+            if source is not None:
+                connection.execute(delete(users).where(users.c.id == user_id))
+
+    @staticmethod
+    def _number_archived(connection, hot, rows):
+        """Give archived rows ids from the hot table's sequence, by inserting
+        them there and deleting them again"""
+        values = [{k: v for k, v in row.items() if k in hot.c} for row in rows]
+        ids = connection.execute(
+            insert(hot).returning(hot.c.id, sort_by_parameter_order=True), values
+        ).scalars().all()
+        connection.execute(delete(hot).where(hot.c.id.in_(ids)))
+        for row, new_id in zip(rows, ids):
+            row["id"] = new_id
+
+    def _register_commands(self, app):
+        @app.cli.group("shards")
+        def shards_command():
+            """Sharded database maintenance."""
+
+        @shards_command.command("upgrade")
+        @click.argument("revision", default="head")
+        def upgrade_command(revision):
+            """Run Alembic migrations on the directory and every shard."""
+            from flask_migrate import upgrade
+
+            upgrade(revision=revision)
+            for key in self.keys:
+                click.echo(f"Upgrading {key}")
+                upgrade(revision=revision, x_arg=[f"shard={key}"])
+
+        @shards_command.command("rebalance")
+        @click.option("--batch-size", default=1000, show_default=True)
+        @click.option("--dry-run", is_flag=True, help="Only list the users that would move.")
+        def rebalance_command(batch_size, dry_run):
+            """Move users to the shards the hash ring assigns them (offline)."""
+            if not self.enabled:
+                raise click.UsageError("Sharding is not enabled (set SHARD_URLS).")
+            moved = self.rebalance(batch_size, dry_run, echo=click.echo)
+            click.echo(f"{'Would move' if dry_run else 'Moved'} {moved} users.")
+
+
+_UNSET = object()
+
+shards = ShardRouter()
@@ -0,0 +1,61 @@
+import ast
+import glob
+import os
+
+from sqlalchemy.exc import DBAPIError
+
+from db import db
+
+
+def migration_heads(directory):
+    """Head revisions of the Alembic scripts in ``directory``.
+
+    Read from the ``revision``/``down_revision`` assignments of the version
+    files, so booting in production doesn't import Alembic (about half of
+    the app's import time).
+    """
+    revisions, parents = set(), set()
+    for path in glob.glob(os.path.join(directory, "versions", "*.py")):
+        with open(path, encoding="utf-8") as script:
+            values = {
+                node.targets[0].id: ast.literal_eval(node.value)
+                for node in ast.parse(script.read()).body
+                if isinstance(node, ast.Assign)
+                and len(node.targets) == 1
+                and isinstance(node.targets[0], ast.Name)
+                and node.targets[0].id in ("revision", "down_revision")
+            }
+        if "revision" not in values:
+            continue
+        revisions.add(values["revision"])
+        down = values.get("down_revision")
+        parents.update(down if isinstance(down, (tuple, list)) else [down] if down else [])
+    return revisions - parents
+
+
+def check_migration_version(app):
+    """Make sure the database is at the latest Alembic revision.
+
+    Used instead of db.create_all() in production mode: a single read of the
+    alembic_version table instead of reflecting every table.
+    """
+    heads = migration_heads(os.path.join(app.root_path, "migrations"))
+
+    with app.app_context():
+        # The directory database, then each shard when sharding is enabled
+        for key, engine in db.engines.items():
+            with engine.connect() as connection:
+                try:
+                    current = set(connection.execute(db.text("SELECT version_num FROM alembic_version")).scalars())
+                except DBAPIError:  # never migrated
+                    current = set()
+            # Don't hand pooled connections over to forked workers (preload_app)
+            engine.dispose()
+
+            if current != heads:
+                name = "Database" if key is None else f"Shard {key}"
+                raise RuntimeError(
+                    f"{name} is at revision {sorted(current) or 'none'} but the latest "
+                    f"migration is {sorted(heads)}. Run `flask db upgrade` "
+                    f"(`flask shards upgrade` with sharding) first."
+                )
@@ -0,0 +1,36 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app  # noqa: E402
+from config import Config  # noqa: E402
+from db import db  # noqa: E402
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    # A file, not :memory:, so concurrent requests share one database
+    monkeypatch.setattr(Config, "SQLALCHEMY_DATABASE_URI", f"sqlite:///{tmp_path / 'test.db'}")
+    monkeypatch.setattr(Config, "STARTUP_MODE", "development")
+    monkeypatch.setattr(Config, "BACKGROUND_JOBS", False)
+    monkeypatch.setattr(Config, "SHARD_URLS", [])
+    app = create_app()
+    yield app
+    with app.app_context():
+        db.engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def auth_headers(client):
+    user = {"username": "student", "email": "student@example.com", "password": "secret"}
+    client.post("/register", json=user)
+    response = client.post("/login", json={"email": user["email"], "password": user["password"]})
+    return {"Authorization": f"Bearer {response.get_json()['access_token']}"}
@@ -0,0 +1,52 @@
+from datetime import date, time
+
+import pytest
+
+from agenda import _day_index, _parse_time, parse_week
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("9:00", time(9, 0)),
+    ("09:00", time(9, 0)),
+    ("09:00:00", time(9, 0)),
+    ("13:45:30", time(13, 45, 30)),
+    ("9am", time(9, 0)),
+    ("12 AM", time(0, 0)),
+    ("2:30 PM", time(14, 30)),
+    ("11 p.m.", time(23, 0)),
+])
+def test_parse_time(value, expected):
+    assert _parse_time(value) == expected
+
+
+@pytest.mark.parametrize("value", ["", "noon", "25:00", "9:60", "13pm", "9-10"])
+def test_parse_time_rejects(value):
+    with pytest.raises(ValueError):
+        _parse_time(value)
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("Monday", 0),
+    ("monday", 0),
+    (" Wed ", 2),
+    ("thu", 3),
+    ("Thurs", 3),
+    ("SUN", 6),
+])
+def test_day_index(value, expected):
+    assert _day_index(value) == expected
+
+
+@pytest.mark.parametrize("value", ["", "T", "Tu", "Mondays", "Funday"])
+def test_day_index_rejects(value):
+    # Too short to tell Tuesday from Thursday, or not a day at all
+    with pytest.raises(ValueError):
+        _day_index(value)
+
+
+def test_parse_week():
+    assert parse_week("2026-W43") == date(2026, 10, 19)
+    assert parse_week("2026-w01") == date(2025, 12, 29)
+    assert parse_week("2026-10-22") == date(2026, 10, 19)
+    with pytest.raises(ValueError, match="Not a valid week"):
+        parse_week("next week")
@@ -0,0 +1,88 @@
+from sqlalchemy import event
+
+from db import db
+
+ASSIGNMENTS = [
+    {"title": "Essay", "subject": "History", "due_date": "2026-03-04T09:00:00", "status": "pending"},
+    {"title": "Lab report", "subject": "Physics", "due_date": "2026-03-02T09:00:00", "status": "completed"},
+    {"title": "Problem set", "subject": "Maths", "due_date": "2026-03-03T09:00:00", "status": "pending"},
+    {"title": "Reading", "subject": "History", "due_date": "2026-03-01T09:00:00", "status": "pending"},
+]
+
+
+def _query(app, client, headers, queries):
+    with app.app_context():
+        engine = db.engine
+    statements = []
+    listener = lambda *args: statements.append(args[2])  # noqa: E731
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        response = client.post("/query", json={"queries": queries}, headers=headers)
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    # The token check reuses the user cached by the requests before
+    return response, statements
+
+
+def _titles(response, name):
+    return [row["title"] for row in response.get_json()["results"][name]]
+
+
+def test_slices_of_one_collection_share_a_query(app, client, auth_headers):
+    for assignment in ASSIGNMENTS:
+        client.post("/assignments", json=assignment, headers=auth_headers)
+
+    response, statements = _query(app, client, auth_headers, {
+        "next": {"collection": "assignments", "params": {"status": "pending"}, "limit": 2},
+        "latest": {"collection": "assignments", "params": {"sort": "-due_date", "fields": "title"}, "limit": 3},
+        "history": {"collection": "assignments", "params": {"subject": "History"}},
+        "none": {"collection": "assignments", "params": {"subject": "Art"}},
+    })
+
+    assert response.status_code == 200, response.get_json()
+    assert len(statements) == 1
+    assert statements[0].count("UNION ALL") == 3
+    # Each slice keeps its own filters, order and limit
+    assert _titles(response, "next") == ["Reading", "Problem set"]
+    assert _titles(response, "latest") == ["Essay", "Problem set", "Lab report"]
+    assert _titles(response, "history") == ["Reading", "Essay"]
+    assert response.get_json()["results"]["none"] == []
+    # Only the requested fields (and id), though the union selects more
+    assert set(response.get_json()["results"]["latest"][0]) == {"id", "title"}
+
+
+def test_one_query_per_collection(app, client, auth_headers):
+    client.post("/assignments", json=ASSIGNMENTS[0], headers=auth_headers)
+    client.post("/notes", json={"title": "Lecture 1", "content": "Limits"}, headers=auth_headers)
+
+    response, statements = _query(app, client, auth_headers, {
+        "assignments": {"collection": "assignments"},
+        "notes": {"collection": "notes"},
+    })
+
+    assert response.status_code == 200
+    assert len(statements) == 2
+    assert not any("UNION ALL" in statement for statement in statements)
+    assert _titles(response, "assignments") == ["Essay"]
+    assert _titles(response, "notes") == ["Lecture 1"]
+
+
+def test_slice_arguments_are_validated(client, auth_headers):
+    response = client.post("/query", json={"queries": {
+        "bad": {"collection": "assignments", "params": {"due_after": "tomorrow"}},
+    }}, headers=auth_headers)
+    assert response.status_code == 422
+    assert "bad" in response.get_json()["errors"]["json"]["queries"]
+
+    response = client.post("/query", json={"queries": {
+        "unindexed": {"collection": "timetable", "params": {"sort": "start_time"}},
+    }}, headers=auth_headers)
+    assert response.status_code == 400
+
+
+def test_limits_are_capped(app, client, auth_headers):
+    limit = app.config["BATCH_MAX_LIMIT"] + 1
+    response = client.post("/query", json={"queries": {
+        "all": {"collection": "notes", "limit": limit},
+    }}, headers=auth_headers)
+    assert response.status_code == 400
@@ -0,0 +1,78 @@
+import time
+
+from sqlalchemy import event
+
+from cache import MISSING, LocalCache, user_cache
+from db import db
+from models import UserModel
+
+
+def test_max_age_skips_older_entries(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    cache = LocalCache(ttl=60)
+    cache.set("key", "value")
+
+    now[0] += 5
+    assert cache.get("key") == "value"
+    assert cache.get("key", max_age=10) == "value"
+    assert cache.get("key", max_age=2) is MISSING
+    # Too old for that caller only, so the entry stays
+    assert cache.get("key") == "value"
+
+    now[0] += 60
+    assert cache.get("key") is MISSING
+
+
+def _cached(user_id):
+    return user_cache.local.get(f"user:{user_id}")
+
+
+def test_user_is_invalidated_on_commit(app, auth_headers):
+    with app.app_context():
+        user_cache.get(1)
+        user = db.session.get(UserModel, 1)
+        user.username = "renamed"
+        db.session.flush()
+        # Not committed yet: another worker would re-cache the old row
+        assert _cached(1)["username"] == "student"
+
+        db.session.commit()
+        assert _cached(1) is MISSING
+        assert user_cache.get(1)["username"] == "renamed"
+
+
+def test_rollback_keeps_the_cached_user(app, auth_headers):
+    with app.app_context():
+        user_cache.get(1)
+        db.session.get(UserModel, 1).username = "renamed"
+        db.session.flush()
+        db.session.rollback()
+
+        assert _cached(1)["username"] == "student"
+        db.session.commit()
+        assert _cached(1)["username"] == "student"
+
+
+def test_token_checks_reuse_the_cached_user(app, client, auth_headers):
+    client.get("/assignments", headers=auth_headers)
+    with app.app_context():
+        engine = db.engine
+    statements = []
+    listener = lambda *args: statements.append(args[2])  # noqa: E731
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        for _ in range(3):
+            assert client.get("/assignments", headers=auth_headers).status_code == 200
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+
+    # One list query per request, as before the blocklist check
+    assert len(statements) == 3
+
+
+def test_deleted_account_is_revoked(client, auth_headers):
+    assert client.delete("/me", headers=auth_headers).status_code == 202
+    response = client.get("/assignments", headers=auth_headers)
+    assert response.status_code == 401
+    assert response.get_json()["error"] == "account_deleted"
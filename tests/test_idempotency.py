@@ -0,0 +1,134 @@
+import json
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+from db import db
+from events import broker
+from models import IdempotencyKeyModel, NoteModel
+from utils.idempotency import _fingerprint
+
+NOTE = {"title": "Lecture 1", "content": "Limits and continuity"}
+
+
+def _with_key(headers, key):
+    return dict(headers, **{"Idempotency-Key": key})
+
+
+def _note_count(app):
+    with app.app_context():
+        return NoteModel.query.count()
+
+
+def test_concurrent_duplicates_create_one_row(app, auth_headers):
+    headers = _with_key(auth_headers, "create-note-1")
+    start = threading.Barrier(8)
+    responses = []
+
+    def post():
+        client = app.test_client()
+        start.wait()
+        responses.append(client.post("/notes", json=NOTE, headers=headers))
+
+    threads = [threading.Thread(target=post) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert [response.status_code for response in responses] == [201] * 8
+    replayed = [response for response in responses if response.headers.get("Idempotent-Replayed") == "true"]
+    assert len(replayed) == 7
+    assert len({response.get_json()["id"] for response in responses}) == 1
+    assert _note_count(app) == 1
+
+
+def test_retry_replays_first_response(app, client, auth_headers):
+    headers = _with_key(auth_headers, "create-note-2")
+    first = client.post("/notes", json=NOTE, headers=headers)
+    retry = client.post("/notes", json=NOTE, headers=headers)
+
+    assert first.status_code == retry.status_code == 201
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert retry.get_json() == first.get_json()
+    assert _note_count(app) == 1
+
+
+def test_same_key_different_body_is_rejected(app, client, auth_headers):
+    headers = _with_key(auth_headers, "create-note-3")
+    assert client.post("/notes", json=NOTE, headers=headers).status_code == 201
+
+    response = client.post("/notes", json=dict(NOTE, title="Lecture 2"), headers=headers)
+    assert response.status_code == 422
+    assert _note_count(app) == 1
+
+
+def test_failed_first_attempt_releases_key(app, client, auth_headers, monkeypatch):
+    headers = _with_key(auth_headers, "create-note-4")
+
+    def fail(**kwargs):
+        raise RuntimeError("database went away")
+
+    monkeypatch.setattr("resources.note_router.NoteModel", fail)
+    assert client.post("/notes", json=NOTE, headers=headers).status_code == 500
+    monkeypatch.undo()
+
+    response = client.post("/notes", json=NOTE, headers=headers)
+    assert response.status_code == 201
+    assert "Idempotent-Replayed" not in response.headers
+    assert _note_count(app) == 1
+
+
+def _hold_key(app, key, locked_at):
+    """An in-progress row, as left by a request that is running or died"""
+    with app.app_context():
+        db.session.add(IdempotencyKeyModel(
+            user_id=1,
+            key=key,
+            fingerprint=_fingerprint("POST", "/notes", json.dumps(NOTE).encode()),
+            expires_at=datetime.utcnow() + timedelta(days=1),
+            locked_at=locked_at,
+        ))
+        db.session.commit()
+
+
+def test_in_progress_key_is_not_taken_over(app, client, auth_headers):
+    app.config["IDEMPOTENCY_WAIT"] = 0
+    _hold_key(app, "create-note-5", datetime.utcnow())
+
+    response = client.post("/notes", data=json.dumps(NOTE), content_type="application/json",
+                           headers=_with_key(auth_headers, "create-note-5"))
+    assert response.status_code == 409
+    assert _note_count(app) == 0
+
+
+def test_stale_in_progress_key_is_taken_over(app, client, auth_headers):
+    lease = timedelta(seconds=app.config["IDEMPOTENCY_LEASE"])
+    _hold_key(app, "create-note-6", datetime.utcnow() - lease - timedelta(seconds=1))
+
+    response = client.post("/notes", data=json.dumps(NOTE), content_type="application/json",
+                           headers=_with_key(auth_headers, "create-note-6"))
+    assert response.status_code == 201
+    assert _note_count(app) == 1
+
+
+def test_insert_and_response_commit_together(app, client, auth_headers, monkeypatch):
+    headers = _with_key(auth_headers, "create-note-7")
+    published = []
+    monkeypatch.setattr(broker, "publish", lambda *args: published.append(args))
+
+    def fail(self, response):
+        raise RuntimeError("worker killed before storing the response")
+
+    with monkeypatch.context() as patch:
+        patch.setattr("flask.Flask.make_response", fail)
+        with pytest.raises(RuntimeError):
+            client.post("/notes", json=NOTE, headers=headers)
+    assert _note_count(app) == 0
+    assert published == []
+
+    response = client.post("/notes", json=NOTE, headers=headers)
+    assert response.status_code == 201
+    assert _note_count(app) == 1
+    assert published == [(1, "notes", "created", response.get_json()["id"])]
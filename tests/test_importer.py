@@ -0,0 +1,89 @@
+import io
+
+from importer import read_ics
+
+TIMETABLE_ICS = """BEGIN:VCALENDAR\r
+VERSION:2.0\r
+BEGIN:VEVENT\r
+SUMMARY:Linear Algebra\r
+DTSTART:20260302T090000\r
+DTEND:20260302T103000\r
+RRULE:FREQ=WEEKLY;BYDAY=MO,WE,1FR\r
+LOCATION:Room 101\\, Main Building\r
+ORGANIZER;CN="Dr. Smith":mailto:smith@example.com\r
+END:VEVENT\r
+BEGIN:VEVENT\r
+SUMMARY:Physics lab with a title long enough to be fol\r
+ ded over two lines\r
+DTSTART:20260305T140000Z\r
+DTEND:20260305T160000Z\r
+ORGANIZER:mailto:lab@example.com\r
+END:VEVENT\r
+END:VCALENDAR\r
+"""
+
+EXAMS_ICS = """BEGIN:VCALENDAR
+BEGIN:VEVENT
+SUMMARY:Calculus
+DTSTART:20260615T093000
+LOCATION:Hall A
+DESCRIPTION:Bring a calculator\\nNo notes
+CATEGORIES:MIDTERM,MATHS
+END:VEVENT
+BEGIN:VEVENT
+SUMMARY:History
+DTSTART:sometime in June
+END:VEVENT
+END:VCALENDAR
+"""
+
+
+def _read(text, kind):
+    return list(read_ics(io.StringIO(text, newline=""), kind))
+
+
+def test_rrule_days_expand_to_one_row_each():
+    rows = _read(TIMETABLE_ICS, "timetable")
+
+    linear_algebra = [row for line, row in rows if line == 3]
+    assert [row["day"] for row in linear_algebra] == ["Monday", "Wednesday", "Friday"]
+    assert linear_algebra[0] == {
+        "subject": "Linear Algebra",
+        "day": "Monday",
+        "start_time": "09:00",
+        "end_time": "10:30",
+        "room": "Room 101, Main Building",
+        "teacher": "Dr. Smith",
+    }
+
+
+def test_folded_lines_are_unfolded():
+    rows = _read(TIMETABLE_ICS, "timetable")
+
+    line, row = rows[-1]
+    assert line == 11
+    assert row["subject"] == "Physics lab with a title long enough to be folded over two lines"
+    # No RRULE: the day of DTSTART
+    assert row["day"] == "Thursday"
+    assert (row["start_time"], row["end_time"]) == ("14:00", "16:00")
+    assert row["teacher"] == "lab@example.com"
+
+
+def test_exams():
+    rows = _read(EXAMS_ICS, "exams")
+
+    assert rows[0] == (2, {
+        "subject": "Calculus",
+        "exam_type": "midterm",
+        "exam_date": "2026-06-15T09:30:00",
+        "room": "Hall A",
+        "notes": "Bring a calculator\nNo notes",
+    })
+    # Left for schema validation to report against the event's line
+    assert rows[1] == (9, {
+        "subject": "History",
+        "exam_type": "exam",
+        "exam_date": "sometime in June",
+        "room": "",
+        "notes": "",
+    })
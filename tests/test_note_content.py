@@ -0,0 +1,32 @@
+# "é" is two bytes in UTF-8; long enough to be stored compressed
+CONTENT = "é" * 2000
+
+
+def _create_note(client, headers):
+    response = client.post("/notes", json={"title": "Accents", "content": CONTENT}, headers=headers)
+    return response.get_json()["id"]
+
+
+def test_full_content_is_text(client, auth_headers):
+    note_id = _create_note(client, auth_headers)
+    response = client.get(f"/notes/{note_id}/content", headers=auth_headers)
+
+    assert response.status_code == 200
+    assert response.mimetype == "text/plain"
+    assert response.headers["Accept-Ranges"] == "bytes"
+    assert response.get_data(as_text=True) == CONTENT
+
+
+def test_range_is_served_as_bytes(client, auth_headers):
+    note_id = _create_note(client, auth_headers)
+    response = client.get(f"/notes/{note_id}/content", headers=dict(auth_headers, Range="bytes=1-4"))
+
+    assert response.status_code == 206
+    # Starts and ends inside a character, so it must not claim to be UTF-8
+    assert response.mimetype == "application/octet-stream"
+    assert response.headers["Content-Range"] == f"bytes 1-4/{len(CONTENT.encode())}"
+    assert response.get_data() == CONTENT.encode()[1:5]
+
+
+def test_content_of_a_missing_note_is_not_found(client, auth_headers):
+    assert client.get("/notes/1/content", headers=auth_headers).status_code == 404
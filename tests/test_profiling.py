@@ -0,0 +1,96 @@
+import os
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from config import Config
+from utils.profiling import SamplingProfiler
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+GEVENT_SCRIPT = """
+from gevent import monkey
+monkey.patch_all()
+
+import time
+import gevent
+from utils.profiling import SamplingProfiler
+
+profiler = SamplingProfiler(interval=0.001)
+
+def request(name):
+    profiler.start(name)
+    deadline = time.monotonic() + 0.2
+    while time.monotonic() < deadline:
+        sum(range(1000))
+        gevent.sleep(0)  # let the other request run
+    profiler.stop()
+
+gevent.joinall([gevent.spawn(request, "first"), gevent.spawn(request, "second")])
+for row in profiler.summary():
+    print(row["endpoint"], row["samples"], "request" in profiler.collapsed(row["endpoint"]))
+"""
+
+
+def _busy(seconds):
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        sum(range(1000))
+
+
+def test_samples_profiled_threads_only():
+    profiler = SamplingProfiler(interval=0.001)
+
+    def request():
+        profiler.start("Busy:GET")
+        _busy(0.2)
+        profiler.stop()
+
+    threads = [threading.Thread(target=request), threading.Thread(target=_busy, args=(0.2,))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    [summary] = profiler.summary()
+    assert summary["endpoint"] == "Busy:GET" and summary["requests"] == 1
+    assert summary["samples"] > 0
+    lines = profiler.collapsed().splitlines()
+    assert all(line.startswith("Busy:GET;") for line in lines)
+    assert all("test_samples_profiled_threads_only" not in line for line in lines)
+    assert any(line.split()[0].endswith(":request;test_profiling:_busy") for line in lines)
+
+
+def test_samples_greenlets_on_gevent():
+    pytest.importorskip("gevent")
+    result = subprocess.run(
+        [sys.executable, "-c", GEVENT_SCRIPT], cwd=ROOT, capture_output=True, text=True, timeout=60,
+    )
+    assert result.returncode == 0, result.stderr
+
+    rows = [line.split() for line in result.stdout.splitlines()]
+    assert [row[0] for row in rows] == ["first", "second"]
+    for name, samples, in_request in rows:
+        assert int(samples) > 0 and in_request == "True"
+
+
+def test_unmatched_paths_share_one_entry(monkeypatch, tmp_path):
+    monkeypatch.setattr(Config, "SQLALCHEMY_DATABASE_URI", f"sqlite:///{tmp_path / 'test.db'}")
+    monkeypatch.setattr(Config, "STARTUP_MODE", "development")
+    monkeypatch.setattr(Config, "BACKGROUND_JOBS", False)
+    monkeypatch.setattr(Config, "SHARD_URLS", [])
+    monkeypatch.setattr(Config, "PROFILING_ENABLED", True)
+    monkeypatch.setattr(Config, "PROFILING_SAMPLE_RATE", 1.0)
+    from app import create_app
+
+    app = create_app()
+    client = app.test_client()
+    for path in ("/no-such-page", "/notes/1/nothing", "/wp-login.php"):
+        assert client.get(path).status_code == 404
+
+    assert app.extensions["profiler"].summary() == [
+        {"endpoint": "<unmatched>:GET", "requests": 3, "samples": 0},
+    ]
@@ -0,0 +1,82 @@
+from datetime import datetime, timedelta
+
+from models import AssignmentModel, TimetableModel
+from utils.query_filters import CollectionQuery
+
+ASSIGNMENT = {"title": "Problem set", "subject": "Maths", "due_date": "2026-03-02T09:00:00"}
+
+
+def _add_assignments(client, headers, *assignments):
+    for assignment in assignments:
+        assert client.post("/assignments", json=dict(ASSIGNMENT, **assignment), headers=headers).status_code == 201
+
+
+def _titles(response):
+    assert response.status_code == 200, response.get_json()
+    return [assignment["title"] for assignment in response.get_json()]
+
+
+def test_indexes_are_read_from_the_model(app):
+    assert sorted(CollectionQuery(AssignmentModel).indexes) == [["due_date"], ["status", "due_date"]]
+    assert CollectionQuery(TimetableModel).indexes == [["day", "start_time"]]
+
+
+def test_range_column_must_follow_bound_columns(app):
+    assignments = CollectionQuery(AssignmentModel)
+    assert assignments._indexed(set(), "due_date")
+    assert assignments._indexed({"status"}, "due_date")
+    assert assignments._indexed(set(), "status")
+    assert not assignments._indexed(set(), "priority")
+
+    timetable = CollectionQuery(TimetableModel)
+    assert timetable._indexed({"day"}, "start_time")
+    assert not timetable._indexed(set(), "start_time")
+    assert not timetable._indexed({"subject"}, "start_time")
+
+
+def test_sort_needs_its_prefix_bound_to_one_value(client, auth_headers):
+    assert client.get("/timetable?sort=start_time", headers=auth_headers).status_code == 400
+    assert client.get("/timetable?sort=start_time&day=Monday", headers=auth_headers).status_code == 200
+    # Two days are two index ranges, so the rows are not in start_time order
+    assert client.get("/timetable?sort=start_time&day=Monday,Tuesday", headers=auth_headers).status_code == 400
+
+
+def test_unknown_sort_is_rejected(client, auth_headers):
+    response = client.get("/assignments?sort=title", headers=auth_headers)
+    assert response.status_code == 400
+    assert "title" in response.get_json()["message"]
+
+
+def test_range_and_sort_on_the_same_column(client, auth_headers):
+    response = client.get("/exams?date_from=2026-03-01T00:00:00&sort=exam_date", headers=auth_headers)
+    assert response.status_code == 200
+    assert client.get("/notes?date_from=2026-03-01T00:00:00&sort=created_at", headers=auth_headers).status_code == 200
+
+
+def test_due_before_includes_the_bound(client, auth_headers):
+    _add_assignments(client, auth_headers, {"title": "On time"}, {"title": "Later", "due_date": "2026-03-02T09:00:01"})
+    response = client.get("/assignments?due_before=2026-03-02T09:00:00", headers=auth_headers)
+    assert _titles(response) == ["On time"]
+
+
+def test_filters_and_sort(client, auth_headers):
+    _add_assignments(
+        client, auth_headers,
+        {"title": "B", "status": "pending", "due_date": "2026-03-03T09:00:00"},
+        {"title": "A", "status": "pending"},
+        {"title": "C", "status": "completed"},
+    )
+    assert _titles(client.get("/assignments?status=pending&sort=-due_date", headers=auth_headers)) == ["B", "A"]
+    assert _titles(client.get("/assignments?status=pending,completed", headers=auth_headers)) == ["A", "C", "B"]
+
+
+def test_upcoming_and_overdue_split_at_now(client, auth_headers):
+    now = datetime.utcnow()
+    _add_assignments(
+        client, auth_headers,
+        {"title": "Overdue", "due_date": (now - timedelta(hours=1)).isoformat()},
+        {"title": "Upcoming", "due_date": (now + timedelta(days=1)).isoformat()},
+        {"title": "Next month", "due_date": (now + timedelta(days=30)).isoformat()},
+    )
+    assert _titles(client.get("/assignments/upcoming", headers=auth_headers)) == ["Upcoming"]
+    assert _titles(client.get("/assignments/overdue", headers=auth_headers)) == ["Overdue"]
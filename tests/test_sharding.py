@@ -0,0 +1,56 @@
+from sqlalchemy import select
+
+from app import create_app
+from config import Config
+from db import db
+from models import NoteModel, UserModel
+from sharding import shards
+
+
+def _sharded_app(tmp_path, monkeypatch, count):
+    monkeypatch.setattr(Config, "SHARD_URLS", [f"sqlite:///{tmp_path / f'shard{index}.db'}" for index in range(count)])
+    return create_app()
+
+
+def _ids_on(app, key):
+    with app.app_context():
+        with db.engines[key].connect() as connection:
+            return set(connection.execute(select(UserModel.__table__.c.id)).scalars())
+
+
+def test_rebalance_moves_each_user_once(app, tmp_path, monkeypatch):
+    # Everyone starts on the only shard, with a note there
+    one_shard = _sharded_app(tmp_path, monkeypatch, 1)
+    client = one_shard.test_client()
+    for index in range(8):
+        user = {"username": f"user{index}", "email": f"user{index}@example.com", "password": "secret"}
+        client.post("/register", json=user)
+        login = {"email": user["email"], "password": user["password"]}
+        token = client.post("/login", json=login).get_json()["access_token"]
+        client.post("/notes", json={"title": "Note", "content": "Text"}, headers={"Authorization": f"Bearer {token}"})
+    assert _ids_on(one_shard, "shard0") == set(range(1, 9))
+
+    two_shards = _sharded_app(tmp_path, monkeypatch, 2)
+    with two_shards.app_context():
+        leaving = {user_id for user_id in range(1, 9) if shards.shard_for(user_id) == "shard1"}
+        assert leaving
+
+        assert shards.rebalance(dry_run=True) == len(leaving)
+        assert shards.rebalance() == len(leaving)
+        assert shards.rebalance() == 0
+
+        for user_id in range(1, 9):
+            with shards.use_shard(shards.shard_for(user_id)):
+                assert NoteModel.query.filter_by(user_id=user_id).count() == 1
+    assert _ids_on(two_shards, "shard1") == leaving
+    assert _ids_on(two_shards, "shard0") == set(range(1, 9)) - leaving
+
+
+def test_unsharded_app_resets_the_router(app, tmp_path, monkeypatch):
+    _sharded_app(tmp_path, monkeypatch, 2)
+    assert shards.keys == ["shard0", "shard1"]
+
+    monkeypatch.setattr(Config, "SHARD_URLS", [])
+    create_app()
+    assert shards.keys == []
+    assert not shards.enabled
@@ -0,0 +1,12 @@
+from flask import current_app
+from flask_smorest import abort
+from flask_jwt_extended import get_jwt_identity
+
+from cache import user_cache
+
+
+def require_admin():
+    """Abort with 403 unless the current user's email is in ADMIN_EMAILS"""
+    user = user_cache.get(int(get_jwt_identity()))
+    if user is None or user["email"] not in current_app.config["ADMIN_EMAILS"]:
+        abort(403, message="Admins only.")
@@ -0,0 +1,49 @@
+from sqlalchemy import func, literal, select, union_all
+
+from db import db
+
+
+class BatchLoader:
+    """Collects slices of the user's collections and loads them with at most
+    one query per model.
+
+    All slices of the same model become members of a single UNION ALL, each
+    with its own filters, ORDER BY and LIMIT, tagged with the slice name and
+    the row's position in that slice.
+    """
+
+    def __init__(self, user_id):
+        self.user_id = user_id
+        self._slices = {}  # CollectionQuery -> list of (name, args, fields, limit)
+
+    def add(self, name, collection_query, args, fields, limit):
+        self._slices.setdefault(collection_query, []).append((name, args, fields, limit))
+
+    def load(self):
+        """Rows per slice name, in each slice's order"""
+        results = {}
+        for collection_query, slices in self._slices.items():
+            model = collection_query.model
+            names = ["id"] + sorted({field for _, _, fields, _ in slices for field in fields} - {"id"})
+            columns = [getattr(model, name).label(name) for name in names]
+
+            members = []
+            for name, args, _, limit in slices:
+                position = func.row_number().over(order_by=collection_query.order_clauses(args))
+                subquery = (
+                    collection_query.query(self.user_id, args)
+                    .with_entities(*columns, position.label("_position"))
+                    .limit(limit)
+                    .subquery()
+                )
+                members.append(select(literal(name).label("_slice"), *subquery.c))
+
+            statement = union_all(*members) if len(members) > 1 else members[0]
+            for name, *_ in slices:
+                results[name] = []
+            for row in db.session.execute(statement):
+                results[row._slice].append(row)
+
+            for name, *_ in slices:
+                results[name].sort(key=lambda row: row._position)
+        return results
@@ -0,0 +1,53 @@
+import gzip
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip is always available
+    brotli = None
+
+
+COMPRESSIBLE_MIMETYPES = {"application/json", "text/html", "text/plain", "text/css", "application/javascript"}
+
+
+def _compress(encoding, data, level):
+    if encoding == "br":
+        return brotli.compress(data, quality=level)
+    return gzip.compress(data, compresslevel=level)
+
+
+def init_compression(app):
+    """Compress responses above COMPRESS_MIN_SIZE bytes with brotli or gzip,
+    whichever the client prefers through Accept-Encoding"""
+    encodings = ["br", "gzip"] if brotli is not None else ["gzip"]
+
+    @app.after_request
+    def compress_response(response):
+        if not app.config["COMPRESS_ENABLED"]:
+            return response
+
+        response.vary.add("Accept-Encoding")
+
+        if (
+            response.direct_passthrough
+            or response.is_streamed
+            or response.status_code < 200
+            or response.status_code in (204, 206, 304)
+            or "Content-Encoding" in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES
+        ):
+            return response
+
+        encoding = request.accept_encodings.best_match(encodings)
+        if encoding is None:
+            return response
+
+        data = response.get_data()
+        if len(data) < app.config["COMPRESS_MIN_SIZE"]:
+            return response
+
+        level = app.config["COMPRESS_BR_LEVEL"] if encoding == "br" else app.config["COMPRESS_GZIP_LEVEL"]
+        response.set_data(_compress(encoding, data, level))
+        response.headers["Content-Encoding"] = encoding
+        return response
@@ -0,0 +1,133 @@
+import hashlib
+import time
+from datetime import datetime, timedelta
+from functools import wraps
+
+from flask import Response, current_app, request
+from flask_smorest import abort
+from flask_jwt_extended import get_jwt_identity
+from sqlalchemy import or_
+from sqlalchemy.exc import IntegrityError
+
+from db import db
+from models.idempotency_key import IdempotencyKeyModel
+
+IDEMPOTENCY_KEY_HEADER = {
+    "in": "header",
+    "name": "Idempotency-Key",
+    "required": False,
+    "schema": {"type": "string", "maxLength": 255},
+    "description": "Retries with the same key replay the first response instead of creating a duplicate",
+}
+
+
+def idempotent(view):
+    """Answer retried POSTs carrying an Idempotency-Key header with the stored
+    response of the first attempt.
+
+    Goes below @jwt_required() and above @blp.arguments()/@blp.response(), so
+    a replay skips validation and the insert. The view only flushes its
+    changes: they are committed here, together with the stored response, so
+    a key never ends up with a response but no row or the reverse. The unique
+    (user_id, key) row acts as the lock: a concurrent duplicate waits for the
+    first request to finish (up to IDEMPOTENCY_WAIT seconds) and replays it.
+    The lock is a lease: if the first request's worker died without
+    releasing it, a retry takes it over after IDEMPOTENCY_LEASE seconds.
+    """
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        key = request.headers.get("Idempotency-Key")
+        if not key:
+            response = view(*args, **kwargs)
+            db.session.commit()
+            return response
+        if len(key) > 255:
+            abort(400, message="Idempotency-Key must be at most 255 characters.")
+
+        user_id = int(get_jwt_identity())
+        fingerprint = _fingerprint(request.method, request.path, request.get_data())
+
+        record_id = _claim(user_id, key, fingerprint)
+        if record_id is None:
+            return _replay(user_id, key, fingerprint)
+
+        try:
+            response = current_app.make_response(view(*args, **kwargs))
+            IdempotencyKeyModel.query.filter_by(id=record_id).update({
+                "status_code": response.status_code,
+                "response_body": response.get_data(as_text=True),
+                "locked_at": None,
+            })
+            db.session.commit()
+        except BaseException:
+            # Let the client retry a request that didn't complete
+            db.session.rollback()
+            IdempotencyKeyModel.query.filter_by(id=record_id).delete()
+            db.session.commit()
+            raise
+        return response
+
+    return wrapper
+
+
+def _fingerprint(method, path, body):
+    digest = hashlib.sha256()
+    for part in (method.encode(), path.encode(), body):
+        digest.update(part + b"\0")
+    return digest.hexdigest()
+
+
+def _claim(user_id, key, fingerprint):
+    """Insert the in-progress row for this key; None if another request holds it"""
+    now = datetime.utcnow()
+    record = IdempotencyKeyModel(
+        user_id=user_id,
+        key=key,
+        fingerprint=fingerprint,
+        expires_at=now + timedelta(seconds=current_app.config["IDEMPOTENCY_TTL"]),
+        locked_at=now,
+    )
+    db.session.add(record)
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        # An expired row that the purger hasn't removed yet doesn't count, nor
+        # does one whose request died without storing a response
+        lease = now - timedelta(seconds=current_app.config["IDEMPOTENCY_LEASE"])
+        released = IdempotencyKeyModel.query.filter(
+            IdempotencyKeyModel.user_id == user_id,
+            IdempotencyKeyModel.key == key,
+            or_(
+                IdempotencyKeyModel.expires_at < now,
+                IdempotencyKeyModel.status_code.is_(None)
+                & or_(IdempotencyKeyModel.locked_at.is_(None), IdempotencyKeyModel.locked_at < lease),
+            ),
+        ).delete()
+        db.session.commit()
+        return _claim(user_id, key, fingerprint) if released else None
+    return record.id
+
+
+def _replay(user_id, key, fingerprint):
+    deadline = time.monotonic() + current_app.config["IDEMPOTENCY_WAIT"]
+    while True:
+        record = IdempotencyKeyModel.query.filter_by(user_id=user_id, key=key).first()
+        if record is None:
+            abort(409, message="The first request with this Idempotency-Key failed; retry it.")
+        if record.fingerprint != fingerprint:
+            abort(422, message="This Idempotency-Key was already used for a different request.")
+        if record.status_code is not None:
+            return Response(
+                record.response_body,
+                status=record.status_code,
+                mimetype="application/json",
+                headers={"Idempotent-Replayed": "true"},
+            )
+        if time.monotonic() > deadline:
+            abort(409, message="A request with this Idempotency-Key is still being processed.")
+
+        # End the transaction so the next read sees the first request's commit
+        db.session.rollback()
+        time.sleep(0.05)
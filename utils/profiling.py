@@ -0,0 +1,189 @@
+import hashlib
+import hmac
+import importlib
+import os
+import random
+import sys
+import time
+from collections import Counter
+
+import click
+from flask import request
+
+PROFILE_HEADER = "X-Profile-Token"
+
+
+class SamplingProfiler:
+    """Statistical profiler for the requests selected for profiling.
+
+    A single background thread wakes up every ``interval`` seconds while at
+    least one profiled request is running, grabs the stacks of those
+    requests and counts them per endpoint and method
+    (``Assignments.AssignmentList:GET``) as collapsed stacks
+    (``frame;frame;frame``, root first). Unprofiled requests are never
+    touched.
+
+    On gevent workers the requests are greenlets of one OS thread, so the
+    sampler is a real OS thread (built from the unpatched primitives) that
+    reads the stack of each suspended request greenlet from ``gr_frame``,
+    and that of the running one from sys._current_frames().
+    """
+
+    def __init__(self, interval=0.005, max_stacks=5000):
+        self.interval = interval
+        self.max_stacks = max_stacks
+        self.stacks = {}  # "endpoint:METHOD" -> Counter of collapsed stacks
+        self.samples = Counter()  # endpoint -> samples taken
+        self.requests = Counter()  # endpoint -> requests profiled
+        self._active = {}  # request thread or greenlet -> (endpoint, OS thread id, greenlet)
+        self._lock = _original("_thread", "allocate_lock")()
+        self._wake = None  # held while the sampler has nothing to do
+        self._pid = None  # process the sampler runs in
+
+    def start(self, endpoint):
+        """Profile the current request until stop()"""
+        greenlet = _current_greenlet()
+        with self._lock:
+            self._active[greenlet or _get_ident()] = (endpoint, _get_ident(), greenlet)
+            self.requests[endpoint] += 1
+            if self._pid != os.getpid():
+                # First profiled request of this (possibly forked) process
+                self._pid = os.getpid()
+                self._wake = _original("_thread", "allocate_lock")()
+                self._wake.acquire()
+                _original("_thread", "start_new_thread")(self._run, ())
+            if self._wake.locked():
+                self._wake.release()
+
+    def stop(self):
+        with self._lock:
+            self._active.pop(_current_greenlet() or _get_ident(), None)
+
+    def collapsed(self, endpoint=None):
+        """Collapsed-stack lines ("stack count"), the input format of
+        flamegraph.pl and speedscope"""
+        with self._lock:
+            items = [
+                (f"{name};{stack}", count)
+                for name, stacks in self.stacks.items()
+                if endpoint in (None, name)
+                for stack, count in stacks.items()
+            ]
+        return "".join(f"{stack} {count}\n" for stack, count in sorted(items))
+
+    def summary(self):
+        with self._lock:
+            return [
+                {"endpoint": name, "requests": self.requests[name], "samples": self.samples[name]}
+                for name in sorted(self.requests)
+            ]
+
+    def reset(self):
+        with self._lock:
+            self.stacks.clear()
+            self.samples.clear()
+            self.requests.clear()
+
+    def _run(self):
+        sleep = _original("time", "sleep")
+        while True:
+            self._wake.acquire()  # until start() releases it
+            while True:
+                sleep(self.interval)
+                with self._lock:
+                    active = list(self._active.values())
+                if not active:
+                    break
+                frames = sys._current_frames()
+                for endpoint, thread_id, greenlet in active:
+                    # A greenlet has no gr_frame while it runs: its stack is
+                    # then that of its OS thread
+                    frame = greenlet.gr_frame if greenlet is not None else None
+                    if frame is None:
+                        frame = frames.get(thread_id)
+                    if frame is not None:
+                        self._record(endpoint, _collapse(frame))
+
+    def _record(self, endpoint, stack):
+        with self._lock:
+            stacks = self.stacks.setdefault(endpoint, Counter())
+            if stack in stacks or len(stacks) < self.max_stacks:
+                stacks[stack] += 1
+            else:
+                stacks["[other]"] += 1
+            self.samples[endpoint] += 1
+
+
+def _original(module, name):
+    """``module.name`` as it was before gevent's monkey-patching, if any"""
+    monkey = sys.modules.get("gevent.monkey")
+    if monkey is not None:
+        return monkey.get_original(module, name)
+    return getattr(importlib.import_module(module), name)
+
+
+def _get_ident():
+    """Id of the current OS thread, also on gevent workers"""
+    return _original("_thread", "get_ident")()
+
+
+def _current_greenlet():
+    """The current greenlet when threads are gevent's, else None"""
+    monkey = sys.modules.get("gevent.monkey")
+    if monkey is None or not monkey.is_module_patched("threading"):
+        return None
+    import gevent
+
+    return gevent.getcurrent()
+
+
+def _collapse(frame):
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{frame.f_globals.get('__name__', '?')}:{code.co_name}".replace(";", ","))
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+def sign_profile_token(secret, timestamp=None):
+    """Value of the X-Profile-Token header that selects a request for profiling"""
+    timestamp = str(int(timestamp if timestamp is not None else time.time()))
+    signature = hmac.new(secret.encode(), timestamp.encode(), hashlib.sha256).hexdigest()
+    return f"{timestamp}.{signature}"
+
+
+def _valid_token(secret, token, max_age=300):
+    timestamp, _, _ = token.partition(".")
+    if not secret or not timestamp.isdigit() or abs(time.time() - int(timestamp)) > max_age:
+        return False
+    return hmac.compare_digest(token, sign_profile_token(secret, timestamp))
+
+
+def init_profiling(app):
+    """Profile a PROFILING_SAMPLE_RATE fraction of requests, and requests
+    with a valid signed X-Profile-Token header. Registers nothing at all
+    unless PROFILING_ENABLED is set."""
+    if not app.config["PROFILING_ENABLED"]:
+        return
+
+    profiler = SamplingProfiler(app.config["PROFILING_INTERVAL"], app.config["PROFILING_MAX_STACKS"])
+    app.extensions["profiler"] = profiler
+    rate = app.config["PROFILING_SAMPLE_RATE"]
+    secret = app.config["PROFILING_SECRET"]
+
+    @app.cli.command("profile-token")
+    def profile_token_command():
+        """Print an X-Profile-Token header value (valid for 5 minutes)."""
+        click.echo(sign_profile_token(secret))
+
+    @app.before_request
+    def start_profiling():
+        token = request.headers.get(PROFILE_HEADER)
+        if random.random() < rate or (token and _valid_token(secret, token)):
+            # Paths that match no route are pooled, not one entry per URL
+            profiler.start(f"{request.endpoint or '<unmatched>'}:{request.method}")
+
+    @app.teardown_request
+    def stop_profiling(exc):
+        profiler.stop()
@@ -0,0 +1,102 @@
+from flask_smorest import abort
+from sqlalchemy.sql import visitors
+
+
+class CollectionQuery:
+    """Whitelisted filters, date ranges and sort keys for a list endpoint.
+
+    :param model: model whose rows belong to ``user_id``
+    :param filters: columns that can be matched against one value or a list
+    :param ranges: query argument -> (column, operator) for range bounds
+    :param sorts: columns the client may sort by (``-column`` for descending)
+    :param default_sort: sort applied when the client doesn't pass one
+    :param archive: model of the table archived rows are moved to, read
+        along with the model when the client passes ``include_archived``
+
+    Only combinations that one of the model's ``(user_id, ...)`` indexes can
+    serve are accepted: the range/sort column must follow, in some index,
+    columns that are all bound to a single value.
+    """
+
+    def __init__(self, model, *, filters=(), ranges=None, sorts=(), default_sort=None, archive=None):
+        self.model = model
+        self.filters = filters
+        self.ranges = ranges or {}
+        self.sorts = sorts
+        self.default_sort = default_sort
+        self.archive = archive
+        self.indexes = [
+            [column.name for column in index.columns][1:]
+            for index in model.__table__.indexes
+            if list(index.columns)[0].name == "user_id"
+        ]
+
+    def query(self, user_id, args, *criteria):
+        """Build the query for ``user_id`` from the parsed query string.
+
+        With ``include_archived`` set and an ``archive`` model, the same
+        filters run on both tables and the rows are combined with UNION ALL.
+        """
+        model = self.model
+        query = self._filter(model, user_id, args, criteria)
+
+        bound = {name for name in self.filters if args.get(name) and len(args[name]) == 1}
+        key_columns = {name for arg, (name, _) in self.ranges.items() if args.get(arg) is not None}
+        sort = args.get("sort") or self.default_sort
+        if sort:
+            if sort.lstrip("-") not in self.sorts:
+                abort(400, message=f"Cannot sort by {sort.lstrip('-')}.")
+            key_columns.add(sort.lstrip("-"))
+
+        if len(key_columns) > 1:
+            abort(400, message=f"Cannot combine ranges/sorting on {', '.join(sorted(key_columns))}: no index covers them together.")
+        if key_columns and not self._indexed(bound, *key_columns):
+            abort(400, message=f"Cannot range/sort on {key_columns.pop()} with these filters: no index covers it.")
+
+        if args.get("include_archived") and self.archive is not None:
+            # Columns of the hot table, selected by name from both tables
+            names = model.__mapper__.column_attrs.keys()
+            archived = self._filter(self.archive, user_id, args, [self._to_archive(c) for c in criteria])
+            query = query.with_entities(*(getattr(model, name) for name in names)).union_all(
+                archived.with_entities(*(getattr(self.archive, name) for name in names))
+            )
+
+        if sort:
+            query = query.order_by(*self.order_clauses(args))
+
+        return query
+
+    def _filter(self, model, user_id, args, criteria):
+        query = model.query.filter(model.user_id == user_id, *criteria)
+        for name in self.filters:
+            values = args.get(name)
+            if not values:
+                continue
+            column = getattr(model, name)
+            query = query.filter(column == values[0] if len(values) == 1 else column.in_(values))
+        for arg, (name, compare) in self.ranges.items():
+            if args.get(arg) is not None:
+                query = query.filter(compare(getattr(model, name), args[arg]))
+        return query
+
+    def _to_archive(self, criterion):
+        """Rewrite a criterion on the hot table's columns for the archive table"""
+        table, archive = self.model.__table__, self.archive.__table__
+        return visitors.replacement_traverse(
+            criterion, {},
+            lambda element: archive.c[element.name] if getattr(element, "table", None) is table else None,
+        )
+
+    def order_clauses(self, args):
+        """ORDER BY for the parsed query string (ids when it has no sort)"""
+        sort = args.get("sort") or self.default_sort
+        if not sort:
+            return [self.model.id]
+        column = getattr(self.model, sort.lstrip("-"))
+        return [column.desc() if sort.startswith("-") else column, self.model.id]
+
+    def _indexed(self, bound, column):
+        return any(
+            column in index and set(index[:index.index(column)]) <= bound
+            for index in self.indexes
+        )
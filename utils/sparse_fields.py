@@ -0,0 +1,32 @@
+from flask_smorest import abort
+from marshmallow import Schema, fields
+from webargs.fields import DelimitedList
+
+
+class SparseFieldsSchema(Schema):
+    """Query string arguments shared by the list endpoints"""
+    only = DelimitedList(fields.Str(), data_key="fields")
+
+
+def select_fields(query, model, schema, only):
+    """Restrict a list query to the requested fields.
+
+    The projection is applied to the SQL SELECT itself: the query returns rows
+    carrying only those columns (always including ``id``), and the schema
+    skips every field that is missing from a row when dumping it.
+    """
+    if not only:
+        return query
+
+    names = field_names(model, schema, only)
+    return query.with_entities(*(getattr(model, name) for name in names))
+
+
+def field_names(model, schema, only):
+    """Validate requested field names; returns them deduplicated, ``id`` first"""
+    columns = model.__mapper__.column_attrs.keys()
+    unknown = [name for name in only if name not in schema._declared_fields or name not in columns]
+    if unknown:
+        abort(400, message=f"Unknown field(s): {', '.join(unknown)}.")
+
+    return ["id"] + [name for name in dict.fromkeys(only) if name != "id"]